@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This script measures the cost of building templates and of validating, outputting and generating examples
+with them, on representative templates and synthetic documents drawn with Template.generate.
+Each benchmark reports its throughput, the percentiles of its latency and its peak memory, and is compared
+against the results stored in baseline.json so that slowdowns are caught before a release.
+
+    python benchmarks/run.py                    # runs the benchmarks and compares them with the baseline
+    python benchmarks/run.py --save-baseline    # records the results as the new baseline
+    python benchmarks/run.py --scale 100 -k validate
+
+The baseline only makes sense on the machine and Python version where it was recorded.
+"""
+
+from __future__ import unicode_literals, print_function, division
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:  # python 2
+    tracemalloc = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from jsontemplate import template, optional, default, mixin, size, strict, cast, kwcast, enum
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# number of records in the documents of the benchmarks at scale 1
+SCALE = 1000
+
+# relative slowdown, or memory increase, above which a benchmark is reported as a regression
+TOLERANCE = 0.25
+
+# increase of the peak memory in KiB, on top of the tolerance, below which small peaks are not reported
+MEMORY_SLACK = 64
+
+PERCENTILES = (50, 90, 99)
+
+timer = getattr(time, 'perf_counter', time.time)  # pylint: disable=invalid-name
+
+
+class Point(object):
+
+    def __init__(self, x, y=0.0):
+        self.x, self.y = x, y
+
+
+RECORD = {
+    'id': int,
+    'name': str,
+    'kind': enum('cat', 'dog', 'pokemon'),
+    'scores': [{float, int}],
+    'tags': size([str], 1, 5),
+    'nickname': optional(str),
+    'age': default(int, 3),
+    'location': (str, int),
+    'owner': mixin({'name': str, 'age': int}, (str, int)),
+    'flags': strict({'active': bool, 'level': int}),
+    'weight': cast(float, int),
+    'position': kwcast(Point, {'x': float, 'y': optional(float)}),
+}
+
+
+def nested(depth):
+    """
+    Returns a template value of dicts nested depth times, and a document accepted by it
+    """
+    value, document = {'leaf': int, 'values': [float]}, {'leaf': 1, 'values': [1.5, 2.5]}
+    for level in range(depth):
+        value = {'level': int, 'name': str, 'child': value}
+        document = {'level': level, 'name': 'level {}'.format(level), 'child': document}
+    return value, document
+
+
+# benchmark name -> function of the number of records, returning the function measured
+BENCHMARKS = {}
+
+
+def benchmark(function):
+    BENCHMARKS[function.__name__] = function
+    return function
+
+
+@benchmark
+def build_records(records):
+    value = {'record{}'.format(i): RECORD for i in range(records // 10)}
+    return lambda: template(value)
+
+
+@benchmark
+def build_nested(records):  # pylint: disable=unused-argument
+    value, _ = nested(100)
+    return lambda: template(value)
+
+
+@benchmark
+def validate_records(records):
+    records_template = template([RECORD])
+    documents = list(template(RECORD).generate(records, seed=0))
+    return lambda: records_template.validate(documents)
+
+
+@benchmark
+def validate_records_strict(records):
+    records_template = template([RECORD])
+    documents = list(template(RECORD).generate(records, seed=0))
+    return lambda: records_template.validate(documents, strict=True)
+
+
+@benchmark
+def validate_records_compiled(records):
+    records_template = template([RECORD]).compile()
+    documents = list(template(RECORD).generate(records, seed=0))
+    return lambda: records_template.validate(documents)
+
+
+@benchmark
+def output_records_full(records):
+    records_template = template([RECORD])
+    documents = list(template(RECORD).generate(records, seed=0))
+    return lambda: records_template.output(documents, full=True)
+
+
+@benchmark
+def validate_numbers(records):
+    numbers_template = template([{float, int}])
+    numbers = [i if i % 3 else i / 7 for i in range(records * 100)]
+    return lambda: numbers_template.validate(numbers)
+
+
+@benchmark
+def validate_nested(records):  # pylint: disable=unused-argument
+    value, document = nested(100)
+    nested_template = template(value)
+    return lambda: nested_template.validate(document, strict=True)
+
+
+@benchmark
+def example_records(records):
+    records_template = template({'record{}'.format(i): RECORD for i in range(records // 10)})
+    return lambda: records_template.example(full=True)
+
+
+@benchmark
+def generate_records(records):
+    record_template = template(RECORD)
+    return lambda: list(record_template.generate(records // 10, seed=0))
+
+
+def percentile(latencies, percent):
+    """
+    Returns the percentile of the sorted latencies, with the nearest rank method
+    """
+    rank = max(0, int(round(percent / 100 * len(latencies))) - 1)
+    return latencies[rank]
+
+
+def measure(function, repeat):
+    """
+    Measures the function, called repeat times after a warm up call, then once more with tracemalloc on
+
+    :return: dict with the throughput in calls per second of the fastest call, which is the least sensitive
+             to the noise of the machine, the latency percentiles in milliseconds,
+             and the peak memory in KiB, None if tracemalloc is not available
+    """
+    function()
+    latencies = []
+    for _ in range(repeat):
+        start = timer()
+        function()
+        latencies.append(timer() - start)
+    latencies.sort()
+    result = {'ops': 1 / latencies[0]}
+    for percent in PERCENTILES:
+        result['p{}'.format(percent)] = percentile(latencies, percent) * 1000
+    result['peak'] = None
+    if tracemalloc is not None:
+        tracemalloc.start()
+        try:
+            function()
+            result['peak'] = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run(names, records, repeat):
+    """
+    :return: dict with the results of each benchmark
+    """
+    results = {}
+    for name in names:
+        results[name] = measure(BENCHMARKS[name](records), repeat)
+        print(format_result(name, results[name]))
+    return results
+
+
+def format_result(name, result):
+    text = '{:<28} {:>10.1f} ops/s'.format(name, result['ops'])
+    text += ''.join('  p{} {:>8.3f} ms'.format(p, result['p{}'.format(p)]) for p in PERCENTILES)
+    if result['peak'] is not None:
+        text += '  peak {:>9.1f} KiB'.format(result['peak'])
+    return text
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    Compares the results with the baseline
+
+    :return: list of the messages describing the regressions
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result['ops'] < reference['ops'] * (1 - tolerance):
+            regressions.append('{}: {:.1f} ops/s instead of {:.1f} ({:+.0%})'.format(
+                name, result['ops'], reference['ops'], result['ops'] / reference['ops'] - 1))
+        if result['peak'] is not None and reference.get('peak') and \
+                result['peak'] > reference['peak'] * (1 + tolerance) + MEMORY_SLACK:
+            regressions.append('{}: peak memory of {:.1f} KiB instead of {:.1f} ({:+.0%})'.format(
+                name, result['peak'], reference['peak'], result['peak'] / reference['peak'] - 1))
+    return regressions
+
+
+def environment(scale):
+    return {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+            'machine': platform.machine(), 'scale': scale}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmarks of jsontemplate')
+    parser.add_argument('-k', dest='pattern', default='', help='only run the benchmarks whose name contains this')
+    parser.add_argument('--scale', type=float, default=1, help='multiplies the size of the documents')
+    parser.add_argument('--repeat', type=int, default=20, help='number of measured calls of each benchmark')
+    parser.add_argument('--baseline', default=BASELINE, help='path of the baseline file')
+    parser.add_argument('--save-baseline', action='store_true', help='records the results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='relative slowdown or memory increase reported as a regression')
+    options = parser.parse_args(args)
+
+    names = sorted(name for name in BENCHMARKS if options.pattern in name)
+    results = run(names, max(10, int(SCALE * options.scale)), options.repeat)
+
+    if options.save_baseline:
+        with open(options.baseline, 'w') as baseline:
+            json.dump({'environment': environment(options.scale), 'results': results}, baseline,
+                      indent=2, sort_keys=True)
+        print('Baseline saved to {}'.format(options.baseline))
+        return 0
+
+    if not os.path.exists(options.baseline):
+        print('No baseline at {}, run with --save-baseline to record one'.format(options.baseline))
+        return 0
+    with open(options.baseline) as baseline:
+        baseline = json.load(baseline)
+    if baseline['environment'] != environment(options.scale):
+        print('Warning: the baseline was recorded with {}'.format(baseline['environment']))
+    regressions = compare(results, baseline['results'], options.tolerance)
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    if not regressions:
+        print('No regression against the baseline')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    # the layout of the dicts and sets depends on the hash seed, which changes the timings from one run to the other
+    if os.environ.get('PYTHONHASHSEED') is None:
+        os.environ['PYTHONHASHSEED'] = '0'
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+    sys.exit(main())
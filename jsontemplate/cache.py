@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This module implements an in-memory cache of the results of a template, for the documents which repeat exactly,
+such as heartbeats, configuration fetches or retries: the document is hashed instead of being traversed
+by the template, and its result is copied from the cache.
+"""
+
+from __future__ import unicode_literals
+import hashlib
+import marshal
+import threading
+from collections import OrderedDict
+from copy import copy, deepcopy
+from functools import partial
+
+from .exceptions import ValidationError
+
+__all__ = ['CachedTemplate']
+
+# default memory budget of a cache, in bytes
+MAX_BYTES = 64 * 1024 * 1024
+
+# attributes of the errors holding the invalid values, which are copied along with the errors
+_VALUES = ('actual_value', 'actual_values')
+
+# estimated size of an entry besides its result: key, digest and slot of the ordered dict
+ENTRY_OVERHEAD = 200
+
+
+def _dump(config):
+    """
+    Returns the marshalled form of the value, which tells apart the types that JSON text does not, such as tuples
+    and lists, or string and integer keys, None if the value holds objects which cannot be marshalled
+    """
+    try:
+        return marshal.dumps(config, 2)
+    except ValueError:
+        return None
+
+
+if hasattr(hashlib, 'blake2b'):
+    def _digest(dump):
+        return hashlib.blake2b(dump, digest_size=16).digest()
+else:  # python 2
+    def _digest(dump):
+        return hashlib.sha1(dump).digest()
+
+
+def _detached(error):
+    """
+    Returns a copy of the error whose invalid values are copied as well, so that it shares nothing
+    with the document it was raised for, nor with the other copies
+    """
+    error = copy(error)
+    for attribute in _VALUES:
+        if hasattr(error, attribute):
+            value = getattr(error, attribute)
+            copied = deepcopy(value)
+            setattr(error, attribute, copied)
+            # the arguments rebuild the error when it is copied or pickled
+            error.args = tuple(copied if arg is value else arg for arg in error.args)
+    return error
+
+
+def _stored(error):
+    """
+    Returns the copy of an error kept by the cache, without the traceback which would hold the frames,
+    and the values in them, of the call which raised it
+    """
+    error = _detached(error)
+    error.__traceback__ = None
+    return error
+
+
+class CachedTemplate(object):
+    """
+    The CachedTemplate class wraps a template, or a compiled template, and keeps the results of output and check
+    for the values it already saw, so that a value which repeats exactly is not traversed by the template again.
+    The values are identified by a hash of their marshalled form along with the strict and full flags, which means
+    that equal dicts whose keys are in a different order are different values for the cache.
+    The least recently used results are evicted when the estimated size of the cache exceeds max_bytes.
+
+    Outputs are returned as independent copies and errors as copies of the cached ones, invalid values included,
+    so that the callers cannot alter the cache, nor alter it by modifying their documents afterwards.
+    Values holding objects which cannot be marshalled bypass the cache.
+    It is obtained by calling the cached method of a template and can be used by several threads.
+    """
+
+    def __init__(self, template, max_bytes=MAX_BYTES):
+        self.template = template
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'bypassed': 0, 'evictions': 0}
+
+    def output(self, config, full=False, strict=False):
+        dump = _dump(config)
+        if dump is None:
+            self._bypass()
+            return self.template.output(config, full, strict)
+        key = _digest(dump), bool(full), bool(strict)
+        entry = self._get(key)
+        if entry is None:
+            try:
+                output = self.template.output(config, full, strict)
+            except ValidationError as error:
+                # raised out of the except clause like on a hit, so that it does not chain the original error
+                entry = None, _stored(error)
+                self._put(key, entry, len(dump))
+            else:
+                result = _dump(output)
+                if result is None:
+                    self._put(key, (partial(deepcopy, deepcopy(output)), None), len(dump))
+                else:
+                    self._put(key, (partial(marshal.loads, result), None), len(result))
+                return output
+        copier, error = entry
+        if error is not None:
+            raise _detached(error)
+        return copier()
+
+    def check(self, config, strict=False):
+        dump = _dump(config)
+        if dump is None:
+            self._bypass()
+            return self.template.check(config, strict)
+        # validations are told apart from the outputs by their full flag
+        key = _digest(dump), None, bool(strict)
+        entry = self._get(key)
+        if entry is None:
+            error = self.template.check(config, strict)
+            if error is None:
+                self._put(key, (None,), 0)
+                return None
+            self._put(key, (_stored(error),), len(dump))
+            return copy(error)
+        return None if entry[0] is None else _detached(entry[0])
+
+    def validate(self, config, strict=False, max_errors=None):
+        if max_errors is not None:
+            return self.template.validate(config, strict, max_errors)
+        error = self.check(config, strict)
+        if error is not None:
+            raise error
+
+    def is_valid(self, config, strict=False):
+        return self.check(config, strict) is None
+
+    def _bypass(self):
+        with self._lock:
+            self._stats['bypassed'] += 1
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            # the most recently used entries are at the end
+            self._entries[key] = entry
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def _put(self, key, result, size):
+        size += ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = result, size
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._stats['evictions'] += 1
+
+    def stats(self):
+        """
+        Returns a dict with the number of hits, misses, values which bypassed the cache and evicted results,
+        along with the number of results in the cache and their estimated size in bytes
+        """
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+        return stats
+
+    def clear(self):
+        """
+        Empties the cache and resets its statistics
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._stats = dict.fromkeys(self._stats, 0)
+
+    @property
+    def name(self):
+        return self.template.name
+
+    def __repr__(self):
+        return 'cached({!r})'.format(self.template)
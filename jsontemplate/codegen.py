@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This module generates straight-line Python source for the validation of a template.
+Each template emits its own checks through the CodeGenerator, so that a whole tree of
+dicts, lists, tuples and mixins becomes a couple of plain functions without any method call per node.
+The generated code can be cached on disk, keyed by the structural fingerprint of the template.
+"""
+
+from __future__ import unicode_literals
+import errno
+import hashlib
+import marshal
+import os
+import tempfile
+from contextlib import contextmanager
+
+from . import exceptions
+
+try:
+    from importlib.util import MAGIC_NUMBER
+except ImportError:  # python 2
+    from imp import get_magic
+    MAGIC_NUMBER = get_magic()
+
+__all__ = ['CodeGenerator', 'generate_validators']
+
+# generated blocks deeper than this are moved to their own function,
+# CPython refuses to compile more than 20 statically nested blocks
+MAX_DEPTH = 12
+
+
+class CodeGenerator(object):
+    """
+    The CodeGenerator class collects the lines and the constants of the generated source.
+    When emit is False, only the constants are collected, which is what is needed to bind
+    code loaded from the disk cache.
+    The constants and the functions are numbered in the order of the traversal and never shared between
+    the nodes, even when the same template object appears twice, so that the layout of the code only depends
+    on the structure of the template, which is what the disk cache is keyed by.
+    """
+
+    def __init__(self, emit=True):
+        self.emit = emit
+        self.functions = []
+        self._functions = 0
+        self.constants = []
+        self._lines = []
+        self._indent = 0
+        self._variables = 0
+
+    def const(self, value):
+        """
+        Returns the name under which the value will be available to the generated code
+        """
+        self.constants.append(value)
+        return '_k{}'.format(len(self.constants) - 1)
+
+    def var(self):
+        self._variables += 1
+        return 'v{}'.format(self._variables)
+
+    def line(self, code):
+        if self.emit:
+            self._lines.append('    ' * self._indent + code)
+
+    @contextmanager
+    def block(self, header):
+        self.line(header + ':')
+        self._indent += 1
+        start = len(self._lines)
+        yield
+        if len(self._lines) == start:
+            self.line('pass')
+        self._indent -= 1
+
+    def first_valid(self, branches):
+        """
+        Emits the branches in turn until one of them does not raise a ValidationError
+
+        :param branches: functions emitting the code of each branch
+        :return: the name of the variable telling if one of the branches succeeded
+        """
+        valid = self.var()
+        self.line('{} = False'.format(valid))
+        for i, branch in enumerate(branches):
+            if i:
+                self.line('if not {}:'.format(valid))
+                self._indent += 1
+            with self.block('try'):
+                branch()
+                self.line('{} = True'.format(valid))
+            with self.block('except ValidationError'):
+                pass
+            if i:
+                self._indent -= 1
+        return valid
+
+    def validate(self, node, var, strict=False):
+        """
+        Emits the validation of the variable var by the template node
+        """
+        if self._indent >= MAX_DEPTH:
+            self.line('{}({})'.format(self.function(node, strict), var))
+        else:
+            node._generate_validate(self, var, strict)
+
+    def function(self, node, strict=False):
+        """
+        Emits a function validating its argument with the template node and returns its name
+        """
+        name = '_f{}'.format(self._functions)
+        self._functions += 1
+        state = self._lines, self._indent, self._variables
+        self._lines, self._indent, self._variables = [], 0, 0
+        with self.block('def {}(v0)'.format(name)):
+            node._generate_validate(self, 'v0', strict)
+        self.functions.append('\n'.join(self._lines))
+        self._lines, self._indent, self._variables = state
+        return name
+
+    @property
+    def source(self):
+        return '\n\n\n'.join(self.functions) + '\n'
+
+
+def _cache_path(template, cache_dir):
+    key = hashlib.sha1(template.fingerprint().encode('ascii') + MAGIC_NUMBER).hexdigest()
+    return os.path.join(cache_dir, 'jsontemplate-{}.bin'.format(key))
+
+
+def _read_cache(path):
+    try:
+        with open(path, 'rb') as cached:
+            return marshal.load(cached)
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_cache(path, code):
+    """
+    Writes the code to the cache, unless the cache directory cannot be written, in which case the code is only
+    kept in memory. Several processes may write the same code at once, the last one replaces the others.
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory)
+    except OSError as error:
+        if error.errno != errno.EEXIST:
+            return
+    temporary = None
+    try:
+        descriptor, temporary = tempfile.mkstemp(dir=directory)
+        with os.fdopen(descriptor, 'wb') as cached:
+            marshal.dump(code, cached)
+        os.rename(temporary, path)
+    except (IOError, OSError):
+        if temporary is not None and os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def generate_validators(template, cache_dir=None):
+    """
+    Generates the lenient and strict validation functions of a template
+
+    :param template: the template to generate the validators of
+    :param cache_dir: if not None, the directory where the generated code is cached
+    :return: (lenient validator, strict validator, generated source or None if loaded from the cache)
+    """
+    path = _cache_path(template, cache_dir) if cache_dir is not None else None
+    code = _read_cache(path) if path is not None else None
+
+    generator = CodeGenerator(emit=code is None)
+    lenient, strict = generator.function(template, False), generator.function(template, True)
+    source = None
+    if code is None:
+        source = generator.source
+        code = compile(source, '<jsontemplate {}>'.format(template.name), 'exec')
+        if path is not None:
+            _write_cache(path, code)
+
+    namespace = {name: getattr(exceptions, name) for name in dir(exceptions) if name.endswith('Error')}
+    namespace.update(('_k{}'.format(i), value) for i, value in enumerate(generator.constants))
+    exec(code, namespace)  # pylint: disable=exec-used
+    return namespace[lenient], namespace[strict], source
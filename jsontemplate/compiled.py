@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This module implements the compiled form of a template.
+Compiling a template turns its tree of Template objects into nested closures, once per combination
+of the strict and full flags, so that validating or outputting a value does not dispatch on the
+template objects anymore. The results and the exceptions are the same as with the template itself.
+The validation functions can also be generated as Python source, see the codegen module.
+"""
+
+from __future__ import unicode_literals
+
+from .codegen import generate_validators
+from .streaming import load_json, loads_json
+from .cache import CachedTemplate, MAX_BYTES
+from .exceptions import ValidationError
+
+__all__ = ['CompiledTemplate']
+
+
+def validate_many(validate, configs):
+    """
+    Runs a validation function over a batch of values without stopping at the first invalid one
+
+    :return: list with, for each value, None if it is valid or the ValidationError describing why it isn't
+    """
+    errors = []
+    append = errors.append
+    for config in configs:
+        try:
+            validate(config)
+        except ValidationError as error:
+            append(error)
+        else:
+            append(None)
+    return errors
+
+
+def output_many(output, configs):
+    """
+    Runs an output function over a batch of values without stopping at the first invalid one
+
+    :return: (outputs, errors) lists with, for each value, either its output and None,
+             or None and the ValidationError raised by the value
+    """
+    outputs, errors = [], []
+    for config in configs:
+        try:
+            outputs.append(output(config))
+        except ValidationError as error:
+            outputs.append(None)
+            errors.append(error)
+        else:
+            errors.append(None)
+    return outputs, errors
+
+
+class CompiledTemplate(object):
+    """
+    The CompiledTemplate class wraps a template and its compiled validation and output functions.
+    It is obtained by calling the compile method of any template.
+    """
+
+    def __init__(self, template, codegen=False, cache_dir=None):
+        self.template = template
+        self.source = None
+        if codegen:
+            self._validate, self._validate_strict, self.source = generate_validators(template, cache_dir)
+        else:
+            self._validate = template._compile_validate(False)
+            self._validate_strict = template._compile_validate(True)
+        self._output = {
+            (full, strict): template._compile_output(full, strict)
+            for full in (False, True) for strict in (False, True)
+        }
+
+    def load(self, filepath, full=False, strict=False, memory_map=False):
+        return self.output(load_json(filepath, memory_map), full, strict)
+
+    def loads(self, data, full=False, strict=False):
+        return self.output(loads_json(data), full, strict)
+
+    def validate(self, config, strict=False, max_errors=None):
+        if max_errors is not None:
+            return self.template.validate(config, strict, max_errors)
+        if strict:
+            self._validate_strict(config)
+        else:
+            self._validate(config)
+
+    def check(self, config, strict=False):
+        try:
+            self.validate(config, strict)
+        except ValidationError as error:
+            return error
+        return None
+
+    def is_valid(self, config, strict=False):
+        return self.check(config, strict) is None
+
+    def validate_many(self, configs, strict=False):
+        return validate_many(self._validate_strict if strict else self._validate, configs)
+
+    def output_many(self, configs, full=False, strict=False):
+        return output_many(self._output[bool(full), bool(strict)], configs)
+
+    def output(self, config, full=False, strict=False):
+        return self._output[bool(full), bool(strict)](config)
+
+    def example(self, full=False):
+        return self.template.example(full)
+
+    def generate(self, n, seed=None, full_ratio=0.5, generators=None):
+        return self.template.generate(n, seed, full_ratio, generators)
+
+    def cached(self, max_bytes=MAX_BYTES):
+        return CachedTemplate(self, max_bytes)
+
+    def validate_patch(self, config, patch, strict=False):
+        return self.template.validate_patch(config, patch, strict)
+
+    def output_patch(self, output, patch, full=False, strict=False):
+        return self.template.output_patch(output, patch, full, strict)
+
+    @property
+    def name(self):
+        return self.template.name
+
+    def __repr__(self):
+        return 'compiled({!r})'.format(self.template)
@@ -3,10 +3,45 @@
 
 """
 This module contains all the exceptions thrown by the package.
-There are two base types for exceptions: TemplateError and ValidationError
+There are two base types for exceptions: TemplateError and ValidationError.
+ValidationErrors only keep the data they are given and build their message when it is needed,
+with the offending values truncated, so that raising them is cheap even for huge documents.
 """
 
 from __future__ import unicode_literals
+from itertools import islice
+
+try:
+    from reprlib import Repr
+except ImportError:  # python 2
+    from repr import Repr  # pylint: disable=import-error
+
+_REPR = Repr()
+_REPR.maxlevel = 3
+_REPR.maxstring = _REPR.maxother = 80
+_REPR.maxlist = _REPR.maxtuple = _REPR.maxdict = _REPR.maxset = _REPR.maxfrozenset = 10
+
+# number of elements of a list which are looked at to describe their types
+MAX_TYPES_SAMPLE = 1000
+
+
+def short_repr(value):
+    """
+    Returns the repr of the value, truncated to a few lines at most
+    """
+    return _REPR.repr(value)
+
+
+def _types(values):
+    return ', '.join(sorted({'<{}>'.format(type(v).__name__) for v in islice(values, MAX_TYPES_SAMPLE)}))
+
+
+def _join(values):
+    values = list(islice(values, _REPR.maxlist + 1))
+    text = ', '.join('"{}"'.format(v) for v in values[:_REPR.maxlist])
+    if len(values) > _REPR.maxlist:
+        text += ', ...'
+    return text
 
 
 class TemplateError(Exception):
@@ -44,9 +79,15 @@ class TemplateTypeError(TemplateError):
 
 class ValidationError(Exception):
     """
-    ValidationErrors are thrown when a JSON dictionary does not fit the specified template
+    ValidationErrors are thrown when a JSON dictionary does not fit the specified template.
+    The errors collected by validate with max_errors have a path, the tuple of the keys and indices
+    leading from the root of the value to the invalid value
     """
-    pass
+    path = None
+
+    def __repr__(self):
+        # the arguments hold the invalid values, which can be huge
+        return '{}({})'.format(type(self).__name__, ', '.join(short_repr(arg) for arg in self.args))
 
 
 class NativeValidationError(ValidationError):
@@ -60,26 +101,42 @@ class NativeValidationError(ValidationError):
     """
 
     def __init__(self, expected_type, actual_value, name):
-        msg = "{} should be a <{}>, but is instead equal to {} of type <{}>".format(
-            name,
-            expected_type.__name__,
-            actual_value,
-            type(actual_value).__name__)
-        ValidationError.__init__(self, msg)
+        ValidationError.__init__(self, expected_type, actual_value, name)
+        self.expected_type = expected_type
+        self.actual_value = actual_value
+        self.name = name
+
+    def __str__(self):
+        return "{} should be a <{}>, but is instead equal to {} of type <{}>".format(
+            self.name,
+            self.expected_type.__name__,
+            short_repr(self.actual_value),
+            type(self.actual_value).__name__)
 
 
 class ListValidationError(ValidationError):
     """
-    ListValidationError are thrown when a list has values whose type are not allowed by the template
+    ListValidationError are thrown when a list has values whose type are not allowed by the template.
+    The index is the one of the element which broke the homogeneity of the list, when it is known
     """
 
-    def __init__(self, possible_types, actual_values, name):
-        msg = "The values of {} can have one of the following types: {}." \
-              "Instead, they have mixed types among {}.".format(
-                  name,
-                  ', '.join('<{}>'.format(t) for t in possible_types)[:-1],
-                  ', '.join({'<{}>'.format(type(v).__name__) for v in actual_values})[:-1])
-        ValidationError.__init__(self, msg)
+    def __init__(self, possible_types, actual_values, name, index=None):
+        ValidationError.__init__(self, possible_types, actual_values, name, index)
+        self.possible_types = possible_types
+        self.actual_values = actual_values
+        self.name = name
+        self.index = index
+
+    def __str__(self):
+        message = "The values of {} can have one of the following types: {}. " \
+                  "Instead, they have mixed types among {}.".format(
+                      self.name,
+                      ', '.join('<{}>'.format(t) for t in self.possible_types),
+                      _types(self.actual_values))
+        if self.index is not None:
+            message += " The element {}[{}] equal to {} breaks their homogeneity.".format(
+                self.name, self.index, short_repr(self.actual_values[self.index]))
+        return message
 
 
 class KeysValidationError(ValidationError):
@@ -89,20 +146,33 @@ class KeysValidationError(ValidationError):
     """
 
     def __init__(self, keys, name):
-        msg = "The following keys are not supposed to be in {}: {}".format(
-            name,
-            ', '.join('"{}"'.format(key) for key in keys)
-        )
-        ValidationError.__init__(self, msg)
+        ValidationError.__init__(self, keys, name)
+        self.keys = keys
+        self.name = name
+
+    def __str__(self):
+        return "The following keys are not supposed to be in {}: {}".format(self.name, _join(self.keys))
 
 
 class SizeValidationError(ValidationError):
     """
     SizeValidationError are thrown when a list has a number of elements which is outside
-    of what is allowed by the template
+    of what is allowed by the template.
+    When truncated is True, the list was not read to its end and actual is only the number of elements read
     """
 
-    def __init__(self, min_size, max_size, actual, name):
+    def __init__(self, min_size, max_size, actual, name, truncated=False):
+        ValidationError.__init__(self, min_size, max_size, actual, name, truncated)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.actual = actual
+        self.name = name
+        self.truncated = truncated
+
+    def __str__(self):
+        name, min_size, max_size, actual = self.name, self.min_size, self.max_size, self.actual
+        if self.truncated:
+            actual = 'more than {}'.format(max_size)
         msg = "{} should have between {} and {} elements but has {}".format(name, min_size, max_size, actual)
         if min_size == max_size:
             msg = "{} should have exactly {} elements but has {}".format(name, max_size, actual)
@@ -110,7 +180,7 @@ class SizeValidationError(ValidationError):
             msg = "{} should have at least {} elements but has {}".format(name, min_size, actual)
         if min_size == 0 or min_size is None:
             msg = "{} should have at most {} elements but has {}".format(name, max_size, actual)
-        ValidationError.__init__(self, msg)
+        return msg
 
 
 class MixinValidationError(ValidationError):
@@ -120,13 +190,18 @@ class MixinValidationError(ValidationError):
     """
 
     def __init__(self, possible_types, actual_value, name):
-        msg = "{} can be of the following types: {}. Instead, it is equal to {} of type <{}>".format(
-            name,
-            ', '.join('<{}>'.format(t) for t in possible_types)[:-1],
-            actual_value,
-            repr(type(actual_value))
+        ValidationError.__init__(self, possible_types, actual_value, name)
+        self.possible_types = possible_types
+        self.actual_value = actual_value
+        self.name = name
+
+    def __str__(self):
+        return "{} can be of the following types: {}. Instead, it is equal to {} of type <{}>".format(
+            self.name,
+            ', '.join('<{}>'.format(t) for t in self.possible_types),
+            short_repr(self.actual_value),
+            type(self.actual_value).__name__
         )
-        ValidationError.__init__(self, msg)
 
 
 class CastValidationError(ValidationError):
@@ -135,9 +210,49 @@ class CastValidationError(ValidationError):
     """
 
     def __init__(self, target, name, error):
+        ValidationError.__init__(self, target, name, error)
+        self.target = target
+        self.name = name
+        self.error = error
+
+    def __str__(self):
         try:
-            typename = '<{}>'.format(target.__name__)
+            typename = '<{}>'.format(self.target.__name__)
         except AttributeError:
-            typename = repr(target)
-        msg = "{} could not be cast to {} because of the following error: {}".format(name, typename, error)
-        ValidationError.__init__(self, msg)
+            typename = repr(self.target)
+        return "{} could not be cast to {} because of the following error: {}".format(
+            self.name, typename, self.error)
+
+
+class EnumValidationError(ValidationError):
+    """
+    EnumValidationError are thrown when a string is not one of the values allowed by an enum
+    """
+
+    def __init__(self, values, actual_value, name):
+        ValidationError.__init__(self, values, actual_value, name)
+        self.values = values
+        self.actual_value = actual_value
+        self.name = name
+
+    def __str__(self):
+        return '{} can only have the following values: {}. Instead, it is equal to {}'.format(
+            self.name,
+            ', '.join(sorted(self.values)),
+            short_repr(self.actual_value)
+        )
+
+
+class PatchValidationError(ValidationError):
+    """
+    PatchValidationError are thrown when a JSON Patch cannot be applied to a document: unknown operation,
+    path which does not exist, or test operation which fails
+    """
+
+    def __init__(self, operation, reason):
+        ValidationError.__init__(self, operation, reason)
+        self.operation = operation
+        self.reason = reason
+
+    def __str__(self):
+        return 'The patch operation {} cannot be applied: {}'.format(short_repr(self.operation), self.reason)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This module generates random documents accepted by a template, to be used as test data.
+Each template draws its own value through the DocumentGenerator, whose random number generator
+is seeded so that the same seed always gives the same documents for the same template.
+"""
+
+from __future__ import unicode_literals
+import random
+import string
+import uuid
+
+from .exceptions import TemplateValueError
+
+__all__ = ['DocumentGenerator']
+
+# the lists without size constraint have between 0 and LIST_LENGTH elements,
+# and the size constraints without max have up to LIST_LENGTH elements more than their min
+LIST_LENGTH = 5
+
+# number of values tried before giving up on finding a value accepted by a cast
+CAST_ATTEMPTS = 20
+
+_LETTERS = string.ascii_letters + string.digits
+
+# functions drawing the source values of the cast targets whose sources are unlikely to be drawn at random
+SOURCES = {
+    uuid.UUID: lambda rand: str(uuid.UUID(int=rand.getrandbits(128))),
+}
+
+
+class DocumentGenerator(object):
+    """
+    The DocumentGenerator class holds the random state shared by the templates while they draw a document
+
+    :param seed: seed of the random number generator, None for a random seed
+    :param full_ratio: probability for each optional value to be present
+    :param generators: dict of the functions drawing the source values of cast targets, called with the random
+                       number generator, which complete and override SOURCES
+    """
+
+    def __init__(self, seed=None, full_ratio=0.5, generators=None):
+        if not 0 <= full_ratio <= 1:
+            raise TemplateValueError('full_ratio must be between 0 and 1, not {}'.format(full_ratio))
+        self.random = random.Random(seed)
+        self.full_ratio = full_ratio
+        self.generators = dict(SOURCES)
+        self.generators.update(generators or ())
+        self._branches = {}
+
+    def documents(self, template, n):
+        for _ in range(n):
+            yield template._random_value(self)
+
+    def filled(self):
+        """
+        Tells if the next optional value is present
+        """
+        return self.random.random() < self.full_ratio
+
+    def length(self, min_length=0, max_length=None):
+        if max_length is None:
+            max_length = min_length + LIST_LENGTH
+        return self.random.randint(min_length, max_length)
+
+    def branch(self, templates):
+        """
+        Picks one of the templates, whose order is made independent of the order of the set they may come from
+        """
+        key = tuple(id(t) for t in templates)
+        try:
+            branches = self._branches[key]
+        except KeyError:
+            branches = self._branches[key] = sorted(templates, key=lambda t: t.fingerprint())
+        return self.random.choice(branches)
+
+    def native(self, value_type):
+        """
+        Draws a value of a native JSON type
+        """
+        if value_type is bool:
+            return self.random.random() < 0.5
+        if value_type is int:
+            return self.random.randint(-1000, 1000)
+        if value_type is float:
+            return round(self.random.uniform(-1000, 1000), 3)
+        if value_type is list:
+            return []
+        if value_type is dict:
+            return {}
+        return ''.join(self.random.choice(_LETTERS) for _ in range(self.random.randint(1, 12)))
+
+    def castable(self, template):
+        """
+        Draws values from the source of a cast until one of them is accepted by its target,
+        or draws it with the function of generators for the target if there is one
+
+        :raise TemplateValueError: if no value is accepted after CAST_ATTEMPTS attempts, or if the value drawn
+                                   by the function of the target is not accepted
+        """
+        try:
+            generate = self.generators.get(template.target)
+        except TypeError:  # unhashable target
+            generate = None
+        if generate is not None:
+            value = generate(self.random)
+            if template.check(value) is not None:
+                raise TemplateValueError('{} does not accept the value {!r} drawn for {!r}'.format(
+                    template.name, value, template.target))
+            return value
+        for _ in range(CAST_ATTEMPTS):
+            value = template.value._random_value(self)
+            if template.check(value) is None:
+                return value
+        raise TemplateValueError('{} could not generate a value accepted by {!r} in {} attempts'.format(
+            template.name, template.target, CAST_ATTEMPTS))
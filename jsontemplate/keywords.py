@@ -7,12 +7,13 @@ python function that return a template with a specific behavior
 """
 
 from __future__ import unicode_literals
-from random import randrange
+from math import ceil
+from random import randrange, Random
 
-from .native import Template
+from .native import Template, _with_path
 from .exceptions import *  # pylint: disable=unused-wildcard-import,wildcard-import
 
-__all__ = ['size', 'cast', 'starcast', 'kwcast', 'number', 'strict', 'enum', 'choice']
+__all__ = ['size', 'sample', 'cast', 'starcast', 'kwcast', 'number', 'strict', 'enum', 'choice']
 
 number = {int, float}  # pylint: disable=invalid-name
 
@@ -26,21 +27,52 @@ except NameError:
 
 class strict(Template):
 
+    __slots__ = ()
+
     def __init__(self, value, name='config'):
         Template.__init__(self, name, True, value)
 
-    def validate(self, config, strict_=True):  # pylint: disable=unused-argument
-        self.value.validate(config, True)
+    def check(self, config, strict_=True):  # pylint: disable=unused-argument
+        return self.value.check(config, True)
+
+    def _collect(self, config, strict_, errors, limit, rpath):  # pylint: disable=unused-argument
+        self.value._collect(config, True, errors, limit, rpath)
+
+    def _types(self, strict_=True):  # pylint: disable=unused-argument
+        return self.value._types(True)
 
     def output(self, config, full=False, strict_=True):  # pylint: disable=unused-argument
         return self.value.output(config, full, True)
 
-    def example(self, full=False):
+    def _iter_output(self, elements, full=False, strict_=True):  # pylint: disable=unused-argument
+        return self.value._iter_output(elements, full, True)
+
+    def _decode(self, decoder, pos, full=False, strict_=True):  # pylint: disable=unused-argument
+        return self.value._decode(decoder, pos, full, True)
+
+    def _resolve(self, key, config, strict_=True):  # pylint: disable=unused-argument
+        return self.value._resolve(key, config, True)
+
+    def _check_container(self, config, strict_=True):  # pylint: disable=unused-argument
+        return self.value._check_container(config, True)
+
+    def _example(self, full=False):
         return self.value.example(full)
 
-    def rebuild(self, name, strict_):  # pylint: disable=unused-argument
-        self._name = name
-        self.value.rebuild(name, True)
+    def _random_value(self, generator):
+        return self.value._random_value(generator)
+
+    def _signature(self):
+        return self.value,
+
+    def _generate_validate(self, gen, var, strict_=True):  # pylint: disable=unused-argument
+        gen.validate(self.value, var, True)
+
+    def _compile_validate(self, strict_=True):  # pylint: disable=unused-argument
+        return self.value._compile_validate(True)
+
+    def _compile_output(self, full=False, strict_=True):  # pylint: disable=unused-argument
+        return self.value._compile_output(full, True)
 
     @Template.strict.setter
     def strict(self, strict_):
@@ -49,6 +81,8 @@ class strict(Template):
 
 class size(Template):
 
+    __slots__ = ('min', 'max')
+
     def __init__(self, value, min_value=0, max_value=None, name=None, strict_=False):
         if min_value > max_value:
             raise TemplateValueError("Min (%i) can't be inferior to max (%i)" % (min_value, max_value))
@@ -60,90 +94,335 @@ class size(Template):
         self.max = max_value
         Template.__init__(self, name, strict_, value)
 
-    def validate(self, config, strict_=False):
-        self.value.validate(config, strict_)
-        error = SizeValidationError(self.min, self.max, len(config), self.name)
-        if len(config) < self.min:
-            raise error
-        if not ((self.max is None) or len(config) <= self.max):
-            raise error
+    def check(self, config, strict_=False):
+        return self.value.check(config, strict_) or self._check_size(config)
+
+    def _collect(self, config, strict_, errors, limit, rpath):
+        self.value._collect(config, strict_, errors, limit, rpath)
+        if isinstance(config, list) and len(errors) < limit:
+            error = self._check_size(config)
+            if error is not None:
+                errors.append(_with_path(error, rpath))
 
-    def example(self, full=False):
+    def _types(self, strict_=False):
+        return self.value._types(strict_)
+
+    def _resolve(self, key, config, strict_=False):
+        return self.value._resolve(key, config, strict_)
+
+    def _check_container(self, config, strict_=False):
+        return self._check_size(config)
+
+    def _check_size(self, config):
+        if len(config) < self.min or not ((self.max is None) or len(config) <= self.max):
+            return SizeValidationError(self.min, self.max, len(config), self.name)
+        return None
+
+    def _example(self, full=False):
         element = self.value.example(full)
         if full:
             return element*(self.max or 10)
         else:
             return element*randrange(self.min or 1, self.max or 10)
 
+    def _example_varies(self, full=False):
+        # the length of the lenient examples is random
+        return not full or Template._example_varies(self, full)
+
+    def _random_value(self, generator):
+        return self.value._random_elements(generator, generator.length(self.min, self.max))
+
     def output(self, config, full=False, strict_=False):
-        self.validate(config, strict_)
-        return self.value.output(config, full, strict_)
+        output = self.value.output(config, full, strict_)
+        error = self._check_size(config)
+        if error is not None:
+            raise error
+        return output
+
+    def _decode(self, decoder, pos, full=False, strict_=False):
+        output, pos = self.value._decode(decoder, pos, full, strict_)
+        error = self._check_size(output)
+        if error is not None:
+            raise error
+        return output, pos
+
+    def _iter_output(self, elements, full=False, strict_=False):
+        return self._iter_size(self.value._iter_output(elements, full, strict_))
+
+    def _iter_size(self, outputs):
+        length = 0
+        for output in outputs:
+            length += 1
+            if self.max is not None and length > self.max:
+                # the rest of the array is not read, it can be huge
+                raise SizeValidationError(self.min, self.max, length, self.name, truncated=True)
+            yield output
+        if length < self.min:
+            raise SizeValidationError(self.min, self.max, length, self.name)
+
+    def _signature(self):
+        return self.strict, self.min, self.max, self.value
+
+    def _generate_validate(self, gen, var, strict_=False):
+        gen.validate(self.value, var, strict_)
+        length = gen.var()
+        gen.line('{} = len({})'.format(length, var))
+        condition = '{} < {}'.format(length, self.min)
+        if self.max is not None:
+            condition += ' or {} > {}'.format(length, self.max)
+        with gen.block('if ' + condition):
+            gen.line('raise SizeValidationError({}, {}, {}, {})'.format(
+                self.min, self.max, length, gen.const(self.name)))
+
+    def _compile_size(self):
+        min_value, max_value, name = self.min, self.max, self.name
+
+        def check_size(config):
+            length = len(config)
+            if length < min_value or (max_value is not None and length > max_value):
+                raise SizeValidationError(min_value, max_value, length, name)
+        return check_size
+
+    def _compile_validate(self, strict_=False):
+        check, check_size = self.value._compile_validate(strict_), self._compile_size()
+
+        def validate(config):
+            check(config)
+            check_size(config)
+        return validate
+
+    def _compile_output(self, full=False, strict_=False):
+        out, check_size = self.value._compile_output(full, strict_), self._compile_size()
+
+        def output(config):
+            result = out(config)
+            check_size(config)
+            return result
+        return output
+
+
+class sample(Template):
+    """
+    The sample keyword validates a deterministic subset of the elements of a list: the first one, the last one
+    and a random sample of the others, of rate times the length of the list but at least min_count elements,
+    drawn with the seed. The size constraints of a size template are still checked on the whole list.
+    The output of the elements which are not sampled is the elements themselves.
+    """
+
+    __slots__ = ('rate', 'min_count', 'seed')
+
+    def __init__(self, value, rate=0.01, min_count=100, seed=0, name=None, strict_=False):
+        if not 0 < rate <= 1:
+            raise TemplateValueError("The rate ({}) must be between 0 and 1".format(rate))
+        if not isinstance(value, (list, size)):
+            raise TemplateTypeError("The sample keyword only applies to arrays")
+        self.rate = rate
+        self.min_count = min_count
+        self.seed = seed
+        Template.__init__(self, name, strict_, value)
+
+    def _elements(self):
+        """
+        Returns the list template validating the elements
+        """
+        return self.value.value if isinstance(self.value, size) else self.value
+
+    def _indices(self, length):
+        """
+        Returns the sorted indices of the sampled elements, None if the whole list is sampled
+        """
+        count = max(self.min_count, int(ceil(self.rate * length)))
+        if count + 2 >= length:
+            return None
+        return [0] + sorted(Random(self.seed).sample(range(1, length - 1), count)) + [length - 1]
+
+    def _check_size(self, config):
+        if isinstance(self.value, size):
+            return self.value._check_size(config)
+        return None
+
+    def _resolve(self, key, config, strict_=False):
+        # a patched element is validated whether it is sampled or not
+        return self.value._resolve(key, config, strict_)
+
+    def _check_container(self, config, strict_=False):
+        return self.value._check_container(config, strict_)
+
+    def _iter_output(self, elements, full=False, strict_=False):
+        # the length of a streamed array is only known at its end, so every element is validated
+        return self.value._iter_output(elements, full, strict_)
+
+    def check(self, config, strict_=False):
+        if not isinstance(config, list):
+            return NativeValidationError(list, config, self.name)
+        indices = self._indices(len(config))
+        if indices is None:
+            return self.value.check(config, strict_)
+        error = self._elements().check([config[i] for i in indices], strict_)
+        if error is not None:
+            return self._error(error, config, indices)
+        return self._check_size(config)
+
+    def output(self, config, full=False, strict_=False):
+        if not isinstance(config, list):
+            raise NativeValidationError(list, config, self.name)
+        indices = self._indices(len(config))
+        if indices is None:
+            return self.value.output(config, full, strict_)
+        try:
+            outputs = self._elements().output([config[i] for i in indices], full, strict_)
+        except ListValidationError as error:
+            raise self._error(error, config, indices)
+        error = self._check_size(config)
+        if error is not None:
+            raise error
+        output = list(config)
+        for index, value in zip(indices, outputs):
+            output[index] = value
+        return output
+
+    @staticmethod
+    def _error(error, config, indices):
+        """
+        Makes the index of the element breaking the homogeneity of the sample relative to the whole list
+        """
+        if isinstance(error, ListValidationError) and error.index is not None:
+            return ListValidationError(error.possible_types, config, error.name, indices[error.index])
+        return error
+
+    def _types(self, strict_=False):
+        return self.value._types(strict_)
+
+    def _example(self, full=False):
+        return self.value.example(full)
+
+    def _random_value(self, generator):
+        return self.value._random_value(generator)
+
+    def _signature(self):
+        return self.strict, self.rate, self.min_count, self.seed, self.value
 
 
 class cast(Template):
 
+    __slots__ = ('target',)
+
+    _transforms = True
+
     def __init__(self, target, source=None, name=None, strict_=False):
         Template.__init__(self, name, strict_, source or {str, bool, int, float, list, dict})
         self.target = target
 
-    def example(self, full=False):
+    def _signature(self):
+        return self.strict, self.target, self.value
+
+    def _example(self, full=False):
         try:
             return self.target(self.value.example(full))
         except Exception: # pylint: disable=broad-except
             return self.target()
 
-    def validate(self, config, strict_=False):
-        self.value.validate(config, strict_)
+    def _random_value(self, generator):
+        return generator.castable(self)
+
+    def check(self, config, strict_=False):
         try:
-            value = self.value.output(config, full=False, strict=strict_)
-            self.target(value)
-        except Exception: # pylint: disable=broad-except
-            try:
-                self.target(config)
-            except Exception as error:
-                raise CastValidationError(self.target, self.name, error)
+            self.output(config, False, strict_)
+        except ValidationError as error:
+            return error
+        return None
 
     def output(self, config, full=False, strict_=False):
-        self.validate(config, strict_)
-        return self.target(self.value.output(config, full, strict_))
+        value = self.value.output(config, full, strict_)
+        try:
+            return self._cast(value)
+        except Exception as error: # pylint: disable=broad-except
+            return self._fallback(config, error)
 
+    def _types(self, strict_=False):
+        return self.value._types(strict_)
 
-class starcast(cast):
+    def _cast(self, value):
+        return self.target(value)
 
-    def validate(self, config, strict_=False):
-        self.value.validate(config, strict_)
+    def _fallback(self, config, error): # pylint: disable=unused-argument
         try:
-            self.target(*self.value.output(config, full=False, strict=strict_))
-        except Exception as error:
+            return self.target(config)
+        except Exception as error: # pylint: disable=broad-except
             raise CastValidationError(self.target, self.name, error)
 
-    def example(self, full=False):
+    def _compile_validate(self, strict_=False):
+        return self._compile_output(False, strict_)
+
+    def _compile_output(self, full=False, strict_=False):
+        out, target, name = self.value._compile_output(full, strict_), self.target, self.name
+
+        def output(config):
+            value = out(config)
+            try:
+                return target(value)
+            except Exception: # pylint: disable=broad-except
+                try:
+                    return target(config)
+                except Exception as error: # pylint: disable=broad-except
+                    raise CastValidationError(target, name, error)
+        return output
+
+
+class starcast(cast):
+
+    __slots__ = ()
+
+    def _example(self, full=False):
         return self.target(*self.value.example(full))
 
-    def output(self, config, full=False, strict_=False):
-        self.validate(config, strict_)
-        return self.target(*self.value.output(config, full, strict_))
+    def _cast(self, value):
+        return self.target(*value)
+
+    def _fallback(self, config, error):
+        raise CastValidationError(self.target, self.name, error)
+
+    def _compile_output(self, full=False, strict_=False):
+        out, target, name = self.value._compile_output(full, strict_), self.target, self.name
+
+        def output(config):
+            value = out(config)
+            try:
+                return target(*value)
+            except Exception as error: # pylint: disable=broad-except
+                raise CastValidationError(target, name, error)
+        return output
 
 
 class kwcast(cast):
 
-    def validate(self, config, strict_=False):
-        self.value.validate(config, strict_)
-        try:
-            self.target(**self.value.output(config, full=False, strict=strict_))
-        except Exception as error:
-            raise CastValidationError(self.target, self.name, error)
+    __slots__ = ()
 
-    def example(self, full=False):
+    def _example(self, full=False):
         return self.target(**self.value.example(full))
 
-    def output(self, config, full=False, strict_=False):
-        self.validate(config, strict_)
-        return self.target(**self.value.output(config, full, strict_))
+    def _cast(self, value):
+        return self.target(**value)
+
+    def _fallback(self, config, error):
+        raise CastValidationError(self.target, self.name, error)
+
+    def _compile_output(self, full=False, strict_=False):
+        out, target, name = self.value._compile_output(full, strict_), self.target, self.name
+
+        def output(config):
+            value = out(config)
+            try:
+                return target(**value)
+            except Exception as error: # pylint: disable=broad-except
+                raise CastValidationError(target, name, error)
+        return output
 
 
 class enum(Template):
 
+    __slots__ = ('upper_values',)
+
     def __init__(self, *values, **kwargs):
         Template.__init__(self, kwargs.get('name'), kwargs.get('strict_', False))
         if any(not isinstance(v, (unicode, str)) for v in values):
@@ -156,40 +435,67 @@ class enum(Template):
         self.value = {unicode(value) for value in values}
         self.upper_values = {unicode(v.upper()) for v in values}
 
-    def example(self, full=False):
+    def _example(self, full=False):
         for value in self.value:
             return value
 
-    def validate(self, config, strict_=False):
+    def _random_value(self, generator):
+        return generator.random.choice(sorted(self.value))
+
+    def _types(self, strict_=False):
+        return frozenset((unicode,))
+
+    def check(self, config, strict_=False):
         if not isinstance(config, unicode):
-            raise NativeValidationError(unicode, config, self.name)
-        error = ValidationError(
-            '{} can only have the following values: {}. Instead, it is equal to {}'.format(
-                self.name,
-                ', '.join(str(v) for v in self.value),
-                config
-            )
-        )
+            return NativeValidationError(unicode, config, self.name)
         if self.strict or strict_:
             if not config in self.value:
-                raise error
+                return EnumValidationError(self.value, config, self.name)
         elif config.upper() not in self.upper_values:
-            raise error
+            return EnumValidationError(self.value, config, self.name)
+        return None
 
     def output(self, config, full=False, strict_=False):
         self.validate(config, strict_)
         return config
 
-    def rebuild(self, name, strict_):
-        self._name = name
-        self._strict = strict_
+    def _generate_validate(self, gen, var, strict_=False):
+        with gen.block('if not isinstance({}, {})'.format(var, gen.const(unicode))):
+            gen.line('raise NativeValidationError({}, {}, {})'.format(gen.const(unicode), var, gen.const(self.name)))
+        if self.strict or strict_:
+            condition = '{} not in {}'.format(var, gen.const(frozenset(self.value)))
+        else:
+            condition = '{}.upper() not in {}'.format(var, gen.const(frozenset(self.upper_values)))
+        with gen.block('if ' + condition):
+            gen.line('raise EnumValidationError({}, {}, {})'.format(gen.const(self.value), var, gen.const(self.name)))
 
-    @Template.name.setter
-    def name(self, name):
-        self._name = name
+    def _compile_validate(self, strict_=False):
+        name, allowed = self.name, self.value
+        if self.strict or strict_:
+            values = frozenset(self.value)
+
+            def validate(config):
+                if not isinstance(config, unicode):
+                    raise NativeValidationError(unicode, config, name)
+                if config not in values:
+                    raise EnumValidationError(allowed, config, name)
+        else:
+            values = frozenset(self.upper_values)
+
+            def validate(config):
+                if not isinstance(config, unicode):
+                    raise NativeValidationError(unicode, config, name)
+                if config.upper() not in values:
+                    raise EnumValidationError(allowed, config, name)
+        return validate
+
+    def _compile_output(self, full=False, strict_=False):
+        validate = self._compile_validate(strict_)
+
+        def output(config):
+            validate(config)
+            return config
+        return output
 
-    @Template.strict.setter
-    def strict(self, strict_):
-        self._strict = strict_
 
 choice = enum
@@ -18,10 +18,20 @@ The validation scheme is the following:
 """
 
 from __future__ import unicode_literals
-import json
+import hashlib
+import marshal
+from copy import deepcopy
+from functools import partial
 
 # pylint: disable=wildcard-import,unused-wildcard-import
 from .exceptions import *
+from .compiled import CompiledTemplate, validate_many, output_many
+from .streaming import load_json, loads_json, TemplateDecoder, iter_array_file, LinesLoader
+from .generator import DocumentGenerator
+from .profiling import Profile
+from .patch import DocumentPatch
+from .cache import CachedTemplate, MAX_BYTES
+from . import parallel
 
 __all__ = ['template', 'mixin', 'optional', 'default']
 
@@ -32,16 +42,31 @@ try:
 except NameError:
     unicode = str # pylint: disable=invalid-name,redefined-builtin
 
+# python types produced by the parsing of a JSON file
+JSON_TYPES = (dict, list, unicode, int, float, bool, type(None))
 
-def template(value, name='config', strict=False):
+_NATIVE_TYPES = frozenset((int, float, bool, dict, list, unicode))
+
+# types of the examples which do not need to be copied
+_IMMUTABLE_TYPES = frozenset((unicode, bytes, int, float, bool, type(None)))
+
+# cached in place of the examples which change from one call to the other
+_VARIES = object()
+
+
+def template(value, name='config', strict=False, intern=False):
     """
     The template function returns a Template which can then be used to validate JSON dictionaries
 
     :param value: the Python dictionary to be transformed in a template
     :param name: the name of the expected JSON file
     :param strict: if True, then strict mode is activated
+    :param intern: if True, the structurally identical sub-templates are shared, see Template._intern
     :return: Template object
     """
+    if intern:
+        return template(value, name, strict)._intern({})
+
     if strict:
         if value in (int, float, bool, str, unicode, list, dict):
             return Native(value, name, strict)
@@ -75,52 +100,569 @@ def template(value, name='config', strict=False):
     raise TemplateFormatError(value)
 
 
+def _dispatch_table(templates, strict=False, values=None):
+    """
+    Maps each JSON type to the templates which can accept a value of this type, in their original order.
+    If values is given, the items of values matching the templates are used instead of the templates.
+    """
+    values = templates if values is None else values
+    types = [t._types(strict) for t in templates]
+    return {
+        json_type: tuple(v for v, accepted in zip(values, types) if accepted is None or json_type in accepted)
+        for json_type in JSON_TYPES
+    }
+
+
+def _rejected_index(checks, config):
+    """
+    Finds the first of the checks accepting every element of the list.
+    When a check rejects an element, only the next checks accepting this element are tried,
+    so that an element rejected by every check is only looked at once by each of them.
+
+    :param checks: functions raising a ValidationError for the elements they do not accept
+    :return: None if one of the checks accepts the whole list,
+             else the index of the furthest element which broke the homogeneity of the list
+    """
+    candidates, rejected = checks, 0
+    while candidates:
+        check, index = candidates[0], 0
+        try:
+            for index, element in enumerate(config):
+                check(element)
+            return None
+        except ValidationError:
+            pass
+        rejected, element, remaining = max(rejected, index), config[index], []
+        for other in candidates[1:]:
+            try:
+                other(element)
+                remaining.append(other)
+            except ValidationError:
+                pass
+        candidates = remaining
+    return rejected
+
+
+def _copier(example):
+    """
+    Returns a function returning independent copies of the example.
+    Examples made of JSON values are marshalled once, unmarshalling them is much faster than copy.deepcopy.
+    The immutable examples, such as None or numbers, are returned as they are.
+    """
+    if type(example) in _IMMUTABLE_TYPES:
+        return lambda: example
+    try:
+        return partial(marshal.loads, marshal.dumps(example, 2))
+    except ValueError:
+        return partial(deepcopy, example)
+
+
+def _with_path(error, rpath):
+    """
+    Sets the path of the error from the (parent path, key) pairs built while collecting the errors
+    """
+    keys = []
+    while rpath is not None:
+        rpath, key = rpath
+        keys.append(key)
+    error.path = tuple(reversed(keys))
+    return error
+
+
+def _renamed(error, name, renamed):
+    """
+    Renames the error raised by the template called name, or by one of the templates under it, after renamed
+    """
+    previous = getattr(error, 'name', None)
+    if previous is not None and previous.startswith(name) and previous[len(name):len(name) + 1] in ('', '['):
+        error.name = renamed + previous[len(name):]
+        # the arguments rebuild the error when it is copied or pickled
+        error.args = tuple(error.name if arg is previous else arg for arg in error.args)
+    return error
+
+
+def _describe(value, identity=False):
+    """
+    Describes a value of the signature of a template as text
+
+    :param identity: if True, templates and callables are described by their identity instead of their structure
+                     and qualified name, which only holds within the process and while they are alive
+    """
+    if identity and (isinstance(value, Template) or callable(value)):
+        # the occurrences of a shared template are the same template
+        return '#{}'.format(id(value.value if isinstance(value, _Shared) else value))
+    if isinstance(value, Template):
+        return value.fingerprint()
+    if isinstance(value, dict):
+        return '{' + ','.join('{}:{}'.format(_describe(k, identity), _describe(v, identity))
+                              for k, v in value.items()) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(_describe(v, identity) for v in value) + ']'
+    if isinstance(value, (set, frozenset)):
+        return '{' + ','.join(sorted(_describe(v, identity) for v in value)) + '}'
+    if isinstance(value, type) or callable(value):
+        # partials and callable instances have no name of their own, they are described by their class
+        name = getattr(value, '__qualname__', None) or getattr(value, '__name__', None) or \
+            getattr(type(value), '__qualname__', type(value).__name__)
+        return '{}.{}'.format(getattr(value, '__module__', None) or type(value).__module__, name)
+    return repr(value)
+
+
 class Template(object):
     """
     The Template class is the base class of all templates.
     Its behavior is to allow the value to be of any type
     """
 
+    __slots__ = ('_key', '_parent', '_strict', '_examples', 'value')
+
+    # True for the templates whose output is not a value they accept, such as casts
+    _transforms = False
+
     def __init__(self, name='config', strict=False, value=None):
-        self._name = name
+        self._key = name
+        self._parent = None
         self._strict = strict
+        self._examples = None
         if value is not None:
-            self.value = template(value, name, strict)
+            self.value = self._child(value)
+
+    def _child(self, value, key=''):
+        """
+        Builds the template of a value nested in this one, named after this template followed by key
+        """
+        child = template(value, key, self._strict)
+        child._parent = self
+        return child
+
+    def load(self, filepath, full=False, strict=False, memory_map=False):
+        """
+        Loads the JSON file and outputs its value
 
-    def load(self, filepath, full=False, strict=False):
-        with open(filepath, 'rb') as data:
-            data = json.load(data)
-        return self.output(data, full, strict)
+        :param memory_map: if True, the file is memory-mapped instead of being read, which lowers the peak memory
+        """
+        return self.output(load_json(filepath, memory_map), full, strict)
 
     def loads(self, data, full=False, strict=False):
-        return self.output(json.loads(data), full, strict)
+        """
+        Loads the JSON document given as text, or as UTF-8 bytes, bytearray or memoryview, and outputs its value
+        """
+        return self.output(loads_json(data), full, strict)
+
+    def decode(self, data, full=False, strict=False):
+        """
+        Decodes the JSON text with the template driving the parser, which gives the same output as loads.
+        Dicts and lists are decoded key by key and element by element, so that wrong types and, in strict mode,
+        unexpected keys are rejected as soon as they are reached, without decoding the rest of the document.
+        The error raised is the one of the first invalid value of the document, by the innermost template rejecting it.
+
+        :param data: JSON text, or UTF-8 bytes, bytearray or memoryview
+        """
+        return TemplateDecoder(data).decode(self, full, strict)
+
+    def _decode(self, decoder, pos, full=False, strict=False):
+        """
+        Decodes the value at the position pos of the text of the decoder
+
+        :return: (output of the value, position following the value)
+        """
+        value, pos = decoder.value(pos)
+        return self.output(value, full, strict), pos
+
+    def _holds_objects(self, strict=False):
+        """
+        Tells if one of the templates under this one can accept an object, directly or in the arrays it accepts,
+        in which case the template decodes its value piece by piece. Values holding no object, such as arrays
+        of numbers, are small enough to be decoded at once.
+        """
+        for child in self._children():
+            accepted = child._types(strict)
+            if accepted is None or dict in accepted or (list in accepted and child._holds_objects(strict)):
+                return True
+        return False
+
+    def _children(self):
+        value = getattr(self, 'value', None)
+        return (value,) if isinstance(value, Template) else ()
+
+    def _replace_children(self, function):
+        """
+        Replaces each template directly under this one by the result of function
+        """
+        if isinstance(getattr(self, 'value', None), Template):
+            self.value = function(self.value)
+
+    def _intern(self, table):
+        """
+        Replaces the templates under this one by the structurally identical templates of table, from the leaves up,
+        and returns the template of table identical to this one, which is this one if there is none yet.
+        Two templates are identical when they have the same class, key and signature, the templates of their
+        signature being compared by identity since they are already interned.
+        A shared template keeps the parent of its first occurrence, the other occurrences are _Shared templates
+        holding it, which rename the errors raised through them after their own location.
+        """
+        self._replace_children(lambda child: child._intern(table))
+        key = '{}{}({})'.format(type(self).__name__, self._key,
+                                ','.join(_describe(v, True) for v in self._signature()))
+        shared = table.setdefault(key, self)
+        return self if shared is self else _Shared(shared, self._key, self._parent)
+
+    def iter_load(self, filepath, full=False, strict=False):
+        """
+        Decodes incrementally the JSON array contained in the file and yields the outputs of its elements
+        one at a time, so that only one element is in memory. Only list templates can be streamed.
+
+        :raise TemplateTypeError: if the template does not accept arrays
+        :raise ValidationError: when the first invalid element is reached
+        """
+        return self._iter_output(iter_array_file(filepath), full, strict)
+
+    def load_lines(self, source, full=False, strict=False, on_error='collect'):
+        """
+        Loads a JSON Lines file, where each line is a value validated and output by the template
+
+        :param source: path of the file, or file object opened in text mode
+        :param on_error: what to do with the rejected lines, 'collect', 'skip' or 'raise'
+        :return: LinesLoader object, iterating over the (line number, output) of the valid lines
+                 and keeping the summary of the rejected ones
+        """
+        return LinesLoader(self._compile_output(full, strict), source, on_error)
+
+    # pylint: disable=unused-argument
+    def _iter_output(self, elements, full=False, strict=False):
+        """
+        Returns an iterator over the outputs of the elements of a list
+        """
+        raise TemplateTypeError('{} is not a list template, its elements cannot be streamed'.format(self.name))
 
     # pylint: disable=unused-argument,no-self-use
     def output(self, config, full=False, strict=False):
         return config
 
-    # pylint: disable=unused-argument,no-self-use
     def example(self, full=False):
+        """
+        Returns an example of value accepted by the template, with the optional values if full is True.
+        The examples are computed once and copied, unless they are immutable or vary from one call to the other.
+        """
+        full, examples = bool(full), self._examples
+        if examples is None:
+            examples = self._examples = {}
+        try:
+            copy = examples[full]
+        except KeyError:
+            example = self._example(full)
+            if self._example_varies(full):
+                examples[full] = _VARIES
+                return example
+            copy = examples[full] = _copier(example)
+        if copy is _VARIES:
+            return self._example(full)
+        return copy()
+
+    # pylint: disable=unused-argument,no-self-use
+    def _example(self, full=False):
         return 'example'
 
+    def _example_varies(self, full=False):
+        """
+        Tells if the example changes from one call to the other, in which case it is not cached
+        """
+        return any(child._example_varies(full) for child in self._children())
+
+    def generate(self, n, seed=None, full_ratio=0.5, generators=None):
+        """
+        Generates random documents accepted by the template, with varied list lengths within the size constraints,
+        branches of mixins and enums and optional values. The same seed always gives the same documents.
+
+        :param n: number of documents
+        :param seed: seed of the random number generator, None for a random seed
+        :param full_ratio: probability for each optional value to be present
+        :param generators: dict of the functions drawing the source values of cast targets, such as date parsers,
+                           whose sources are unlikely to be drawn at random, called with a random.Random
+        :return: iterator over the documents
+        """
+        return DocumentGenerator(seed, full_ratio, generators).documents(self, n)
+
+    def _random_value(self, generator):
+        """
+        Draws a random value accepted by the template from the DocumentGenerator
+        """
+        return generator.native(generator.random.choice((int, float, bool, unicode)))
+
+    def validate(self, config, strict=False, max_errors=None):
+        """
+        Validates the value against the template and raises the first error found
+
+        :param max_errors: if not None, the validation goes on after the errors instead of raising the first one,
+                           and the list of the first max_errors errors is returned, each with its path
+        """
+        if max_errors is not None:
+            if max_errors < 1:
+                raise TemplateValueError('max_errors must be at least 1, not {}'.format(max_errors))
+            errors = []
+            self._collect(config, strict, errors, max_errors, None)
+            return errors
+        error = self.check(config, strict)
+        if error is not None:
+            raise error
+
+    def _collect(self, config, strict, errors, limit, rpath):
+        """
+        Appends the errors of the value to errors, until there are limit errors
+
+        :param rpath: path of the value, as nested (parent path, key) pairs
+        """
+        error = self.check(config, strict)
+        if error is not None:
+            errors.append(_with_path(error, rpath))
+
+    # pylint: disable=unused-argument,no-self-use
+    def check(self, config, strict=False):
+        """
+        Checks the value against the template without raising
+
+        :return: None if the value is valid, the ValidationError describing why it isn't otherwise
+        """
+        return None
+
+    def is_valid(self, config, strict=False):
+        return self.check(config, strict) is None
+
+    def validate_patch(self, config, patch, strict=False):
+        """
+        Applies a JSON Patch to a value accepted by the template, and only validates the values the patch added,
+        replaced or removed, along with the size and keys constraints of the arrays and objects holding them.
+        The value is not modified, the patched value shares with it the arrays and objects the patch did not touch.
+
+        :param patch: list of JSON Patch operations
+        :return: the patched value
+        :raise PatchValidationError: if an operation of the patch cannot be applied
+        """
+        patched = DocumentPatch(config).apply(patch)
+        for path, removed in patched.paths():
+            resolved = self._resolve_path(patched.document, path, removed, strict)
+            if resolved is not None:
+                node, value, _, strict_ = resolved
+                node.validate(value, strict_)
+        return patched.document
+
+    def output_patch(self, output, patch, full=False, strict=False):
+        """
+        Applies a JSON Patch, whose values are input values, to the output of a value accepted by the template,
+        and only validates and outputs the values the patch added, replaced or removed.
+        The values nested in casts cannot be patched, since their output is the one of the cast.
+
+        :param output: output of a value accepted by the template, which is not modified
+        :param patch: list of JSON Patch operations
+        :return: the output of the patched value
+        :raise PatchValidationError: if an operation of the patch cannot be applied
+        """
+        patched = DocumentPatch(output).apply(patch)
+        for path, removed in patched.paths():
+            resolved = self._resolve_path(patched.document, path, removed, strict)
+            if resolved is None:
+                continue
+            node, value, depth, strict_ = resolved
+            if depth < len(path) and node._transforms_below():
+                raise TemplateValueError('{} cannot be patched at {} since it holds casts'.format(
+                    node.name, '/'.join(unicode(key) for key in path)))
+            if value is None:
+                node.validate(value, strict_)
+                value = node.example(full)
+            else:
+                value = node.output(value, full, strict_)
+            patched.set(path[:depth], value)
+        return patched.document
+
+    def _resolve_path(self, config, path, removed, strict=False):
+        """
+        Follows the path of a patched value through the templates, and checks the constraints of its container
+
+        :return: (template, value, depth, strict) where the template validates the value at path[:depth],
+                 which is the patched value unless a template on the way cannot tell which of its children holds it,
+                 or None if the patched value is an element removed from an array
+        :raise ValidationError: if the container of the patched value breaks its constraints
+        """
+        node = self
+        for depth, key in enumerate(path):
+            child = node._resolve(key, config, strict)
+            if child is None:
+                return node, config, depth, strict
+            if depth == len(path) - 1:
+                error = node._check_container(config, strict)
+                if error is not None:
+                    raise error
+                if removed and isinstance(config, list):
+                    return None
+            node, config, strict = child
+        return node, config, len(path), strict
+
     # pylint: disable=unused-argument,no-self-use
-    def validate(self, config, strict=False):
-        pass
+    def _resolve(self, key, config, strict=False):
+        """
+        Returns the (template, value, strict) of the value at the key of config, config being accepted
+        by the type of the template, or None if the template cannot tell which template validates it
+        """
+        return None
+
+    # pylint: disable=unused-argument,no-self-use
+    def _check_container(self, config, strict=False):
+        """
+        Checks the constraints of an array or object that do not depend on its values, once _resolve accepted it
+        """
+        return None
+
+    def _transforms_below(self):
+        return self._transforms or any(child._transforms_below() for child in self._children())
+
+    def validate_many(self, configs, strict=False):
+        """
+        Validates a batch of values, the template is compiled once for the whole batch
+
+        :param configs: iterable of values to validate
+        :return: list with, for each value, None if it is valid or the ValidationError describing why it isn't
+        """
+        return validate_many(self._compile_validate(strict), configs)
+
+    def output_many(self, configs, full=False, strict=False):
+        """
+        Validates and outputs a batch of values, the template is compiled once for the whole batch
+
+        :param configs: iterable of values to output
+        :return: (outputs, errors) lists with, for each value, either its output and None,
+                 or None and the ValidationError raised by the value
+        """
+        return output_many(self._compile_output(full, strict), configs)
+
+    def validate_parallel(self, configs, strict=False, workers=None, chunksize=parallel.CHUNK_SIZE):
+        """
+        Validates a batch of values in a pool of worker processes, the results are in the order of the values
+
+        :param workers: number of worker processes, defaults to the number of CPUs
+        :param chunksize: number of values sent at once to a worker
+        :return: the same list as validate_many
+        """
+        return parallel.validate_parallel(self, configs, strict, workers, chunksize)
+
+    def output_parallel(self, configs, full=False, strict=False, workers=None, chunksize=parallel.CHUNK_SIZE):
+        """
+        Validates and outputs a batch of values in a pool of worker processes
+
+        :param workers: number of worker processes, defaults to the number of CPUs
+        :param chunksize: number of values sent at once to a worker
+        :return: the same lists as output_many
+        """
+        return parallel.output_parallel(self, configs, full, strict, workers, chunksize)
+
+    def profile(self):
+        """
+        Returns a Profile which, while it is active, records the calls, time, failures and cast invocations
+        of each node of the template
+
+            with config_template.profile() as profile:
+                config_template.validate(config)
+            print(profile.report())
+        """
+        return Profile(self)
+
+    def __getstate__(self):
+        # templates have no __dict__ unless they are of a subclass without __slots__
+        state = dict(getattr(self, '__dict__', ()))
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                if hasattr(self, slot):
+                    state[slot] = getattr(self, slot)
+        # the dispatch tables and the examples are caches, they are rebuilt on demand
+        if '_dispatch' in state:
+            state['_dispatch'] = {}
+        state['_examples'] = None
+        return state
+
+    def __setstate__(self, state):
+        for attribute, value in state.items():
+            setattr(self, attribute, value)
+
+    # pylint: disable=unused-argument,no-self-use
+    def _types(self, strict=False):
+        """
+        Returns the JSON types that the template can accept, None if it can accept any type
+        """
+        return None
+
+    def compile(self, codegen=False, cache_dir=None):
+        """
+        Compiles the template into nested closures, with the strict and lenient variants baked in
+
+        :param codegen: if True, the validation functions are generated as straight-line Python source
+        :param cache_dir: if not None, the directory where the generated code is cached between processes
+        :return: CompiledTemplate object
+        """
+        return CompiledTemplate(self, codegen, cache_dir)
+
+    def cached(self, max_bytes=MAX_BYTES):
+        """
+        Returns a CachedTemplate keeping the outputs and errors of the values it already saw, so that the values
+        which repeat exactly are hashed instead of being validated again
+
+        :param max_bytes: estimated memory above which the least recently used results are evicted
+        """
+        return CachedTemplate(self, max_bytes)
+
+    def fingerprint(self):
+        """
+        Returns a hash of the structure of the template which is stable across processes.
+        Names are not part of the structure.
+        """
+        signature = '{}({})'.format(type(self).__name__, ','.join(_describe(v) for v in self._signature()))
+        return hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+    def _signature(self):
+        return self.strict, getattr(self, 'value', None)
+
+    def _generate_validate(self, gen, var, strict=False):
+        if type(self) is not Template:  # pylint: disable=unidiomatic-typecheck
+            gen.line('{}({})'.format(gen.const(self._compile_validate(strict)), var))
+
+    def _compile_validate(self, strict=False):
+        validate = self.validate
+
+        def validator(config):
+            validate(config, strict)
+        return validator
+
+    def _compile_output(self, full=False, strict=False):
+        output = self.output
+
+        def outputter(config):
+            return output(config, full, strict)
+        return outputter
 
     def rebuild(self, name, strict):
-        self._name = name or self._name
-        self._strict = strict
-        self.value.name = self._name
-        self.value.strict = strict
+        """
+        Renames the template and gives it the strictness of its new parent, without going through its children
+        unless their strictness changes: their names are computed from this one when they are needed.
+        """
+        if name is not None:
+            self.name = name
+        self._examples = None
+        if strict != self._strict:
+            self.strict = strict
 
     @property
     def name(self):
-        return self._name
+        node, keys = self, []
+        while node._parent is not None:
+            keys.append(node._key)
+            node = node._parent
+        if not keys:
+            return node._key
+        keys.reverse()
+        return '{}{}'.format(node._key, ''.join(keys))
 
     @name.setter
     def name(self, name):
-        self._name = name
-        self.value.name = name
+        self._key = name
+        self._parent = None
 
     @property
     def strict(self):
@@ -129,20 +671,27 @@ class Template(object):
     @strict.setter
     def strict(self, strict):
         self._strict = strict
-        self.value.strict = strict
+        for child in self._children():
+            child.strict = strict
 
     def __repr__(self):
         return repr(self.value)
 
 
+# template of the values which are not described by their template, such as the extra keys of a dict
+_ANYTHING = Template('')
+
+
 class Native(Template):
 
+    __slots__ = ()
+
     def __init__(self, value, name, strict=False):
         Template.__init__(self, name, strict)
         if value is str:
             self.value = unicode
 
-        elif value in {int, float, bool, dict, list, unicode}:
+        elif value in _NATIVE_TYPES:
             self.value = value
 
         elif not strict:
@@ -151,43 +700,120 @@ class Native(Template):
         else:
             raise TemplateFormatError(value)
 
-    def validate(self, config, strict=False):
+    def check(self, config, strict=False):
         if (self.strict or strict) and not isinstance(config, self.value):
-            raise NativeValidationError(self.value, config, self.name)
-        else:
-            try:
-                old_type = type(config)
-                converted = self.value(config)
-                back_conv = old_type(converted)
-                if back_conv != config:
-                    raise NativeValidationError(self.value, config, self.name)
-            except (ValueError, TypeError):
-                raise NativeValidationError(self.value, config, self.name)
-
-    def example(self, full=False):
+            return NativeValidationError(self.value, config, self.name)
+        try:
+            old_type = type(config)
+            converted = self.value(config)
+            back_conv = old_type(converted)
+            if back_conv != config:
+                return NativeValidationError(self.value, config, self.name)
+        except (ValueError, TypeError):
+            return NativeValidationError(self.value, config, self.name)
+        return None
+
+    def _example(self, full=False):
         if self.value is unicode:
             return 'example'
         return self.value()
 
+    def _random_value(self, generator):
+        if self.value in _NATIVE_TYPES:
+            return generator.native(self.value)
+        return self.example()
+
+    def _types(self, strict=False):
+        if self.strict or strict:
+            return frozenset(t for t in JSON_TYPES if issubclass(t, self.value))
+        # scalars are converted into each other, and empty arrays into empty objects
+        if self.value in (int, float, bool, unicode):
+            return frozenset((int, float, bool, unicode))
+        if self.value in (list, dict):
+            return frozenset((list, dict))
+        return None
+
     def output(self, config, full=False, strict=False):
         if self.strict or strict:
             self.validate(config, True)
             return config
+        try:
+            converted = self.value(config)
+            if type(config)(converted) != config:
+                raise NativeValidationError(self.value, config, self.name)
+        except (ValueError, TypeError):
+            raise NativeValidationError(self.value, config, self.name)
+        return converted
+
+    def _compile_validate(self, strict=False):
+        value, name = self.value, self.name
+
+        def lenient(config):
+            try:
+                old_type = type(config)
+                if old_type(value(config)) != config:
+                    raise NativeValidationError(value, config, name)
+            except (ValueError, TypeError):
+                raise NativeValidationError(value, config, name)
+
+        if not (self.strict or strict):
+            return lenient
+
+        if value in (int, bool, unicode, list, dict):
+            # the conversion round trip cannot fail for instances of these types
+            def validate(config):
+                if not isinstance(config, value):
+                    raise NativeValidationError(value, config, name)
+        elif value is float:
+            # NaN is the only float which does not survive the round trip
+            def validate(config):
+                if not isinstance(config, float) or config != config:
+                    raise NativeValidationError(value, config, name)
         else:
-            self.validate(config, strict)
-            return self.value(config)
+            def validate(config):
+                if not isinstance(config, value):
+                    raise NativeValidationError(value, config, name)
+                lenient(config)
+        return validate
+
+    def _generate_validate(self, gen, var, strict=False):
+        value = gen.const(self.value)
+        error = 'raise NativeValidationError({}, {}, {})'.format(value, var, gen.const(self.name))
+        if self.strict or strict:
+            if self.value is float:
+                condition = 'not isinstance({0}, float) or {0} != {0}'.format(var)
+            else:
+                condition = 'not isinstance({}, {})'.format(var, value)
+            with gen.block('if ' + condition):
+                gen.line(error)
+            if self.value in (int, bool, unicode, list, dict, float):
+                return
+        with gen.block('try'):
+            with gen.block('if type({0})({1}({0})) != {0}'.format(var, value)):
+                gen.line(error)
+        with gen.block('except (ValueError, TypeError)'):
+            gen.line(error)
+
+    def _compile_output(self, full=False, strict=False):
+        if self.strict or strict:
+            validate = self._compile_validate(True)
 
-    def rebuild(self, name, strict):
-        self._name = name
-        self._strict = strict
+            def output(config):
+                validate(config)
+                return config
+            return output
 
-    @Template.name.setter
-    def name(self, name):
-        self._name = name
+        value, name = self.value, self.name
 
-    @Template.strict.setter
-    def strict(self, strict):
-        self._strict = strict
+        def output(config):
+            try:
+                converted = value(config)
+                if type(config)(converted) != config:
+                    raise NativeValidationError(value, config, name)
+            except (ValueError, TypeError):
+                raise NativeValidationError(value, config, name)
+            return converted
+        return output
 
     def __repr__(self):
         return '<{}>'.format(self.value.__name__)
@@ -195,23 +821,43 @@ class Native(Template):
 
 class Dict(Template):
 
+    __slots__ = ()
+
     def __init__(self, value, name='config', strict=False):
         Template.__init__(self, name, strict)
-        self.value = {k: template(v, '{}[{}]'.format(name, k), strict) for k, v in value.items()}
+        self.value = {k: self._child(v, '[{}]'.format(k)) for k, v in value.items()}
 
-    def validate(self, config, strict=False):
+    def check(self, config, strict=False):
         if not isinstance(config, dict):
-            raise NativeValidationError(dict, config, self.name)
+            return NativeValidationError(dict, config, self.name)
 
         if self.strict or strict:
             keys = set(config.keys()).difference(set(self.value.keys()))
             if len(keys) > 0:
-                raise KeysValidationError(keys, self.name)
+                return KeysValidationError(keys, self.name)
 
         for key, subt in self.value.items():
-            subt.validate(config.get(key), strict)
+            error = subt.check(config.get(key), strict)
+            if error is not None:
+                return error
+        return None
 
-    def example(self, full=False):
+    def _collect(self, config, strict, errors, limit, rpath):
+        if not isinstance(config, dict):
+            return Template._collect(self, config, strict, errors, limit, rpath)
+        if self.strict or strict:
+            keys = set(config).difference(self.value)
+            if keys:
+                errors.append(_with_path(KeysValidationError(keys, self.name), rpath))
+        for key, subt in self.value.items():
+            if len(errors) >= limit:
+                return
+            subt._collect(config.get(key), strict, errors, limit, (rpath, key))
+
+    def _types(self, strict=False):
+        return frozenset((dict,))
+
+    def _example(self, full=False):
         example = dict()
         for key, templ in self.value.items():
             value = templ.example(full)
@@ -219,138 +865,532 @@ class Dict(Template):
                 example[key] = value
         return example
 
+    def _random_value(self, generator):
+        document = dict()
+        for key, templ in self.value.items():
+            value = templ._random_value(generator)
+            if value is not None:
+                document[key] = value
+        return document
+
     def output(self, config, full=False, strict=False):
-        self.validate(config, strict)
-        output = dict()
-        keys = set(config.keys()).union(set(self.value.keys()))
-        for key in keys:
-            templ = self.value.get(key)
+        if not isinstance(config, dict):
+            raise NativeValidationError(dict, config, self.name)
+
+        keys = set(config.keys()).difference(set(self.value.keys()))
+        if (self.strict or strict) and len(keys) > 0:
+            raise KeysValidationError(keys, self.name)
+
+        output = {key: config[key] for key in keys if config[key] is not None}
+        for key, templ in self.value.items():
             value = config.get(key)
-            if templ is None and value is not None:
-                output[key] = value
-                continue
-            if templ is not None and value is None:
+            if value is None:
+                templ.validate(value, strict)
                 value = templ.example(full)
-            if templ is not None and value is not None:
+            else:
                 value = templ.output(value, full, strict)
             if value is not None:
                 output[key] = value
 
         return output
 
-    def rebuild(self, name, strict):
-        self._name = name
-        self._strict = strict
-        for key, value in self.value.items():
-            value.rebuild('{}[{}]'.format(name, key), strict)
+    def _resolve(self, key, config, strict=False):
+        if not isinstance(config, dict):
+            return None
+        return self.value.get(key, _ANYTHING), config.get(key), strict
 
-    @Template.name.setter
-    def name(self, name):
-        self._name = name
-        for key, value in self.value.items():
-            value.name = '{}[{}]'.format(name, key)
+    def _check_container(self, config, strict=False):
+        if self.strict or strict:
+            keys = set(config).difference(self.value)
+            if keys:
+                return KeysValidationError(keys, self.name)
+        return None
+
+    def _children(self):
+        return self.value.values()
+
+    def _replace_children(self, function):
+        self.value = {k: function(v) for k, v in self.value.items()}
+
+    def _decode(self, decoder, pos, full=False, strict=False):
+        char, pos = decoder.peek(pos)
+        if char != '{' or not decoder.holds_objects(self, strict):
+            return Template._decode(self, decoder, pos, full, strict)
+        check_keys = self.strict or strict
+        output, seen = {}, set()
+        char, pos = decoder.peek(pos + 1)
+        closed, pos = (True, decoder.skip(pos + 1)) if char == '}' else (False, pos)
+        while not closed:
+            key, pos = decoder.key(pos)
+            templ = self.value.get(key)
+            if templ is None:
+                if check_keys:
+                    raise KeysValidationError({key}, self.name)
+                value, pos = decoder.value(pos)
+            elif decoder.is_null(pos):
+                _, pos = decoder.value(pos)
+                templ.validate(None, strict)
+                value = templ.example(full)
+            else:
+                value, pos = templ._decode(decoder, pos, full, strict)
+            seen.add(key)
+            if value is None:
+                output.pop(key, None)
+            else:
+                output[key] = value
+            closed, pos = decoder.next(pos, '}')
 
-    @Template.strict.setter
-    def strict(self, strict):
-        self._strict = strict
-        for value in self.value.values():
-            value.strict = strict
+        for key, templ in self.value.items():
+            if key not in seen:
+                templ.validate(None, strict)
+                value = templ.example(full)
+                if value is not None:
+                    output[key] = value
+        return output, pos
+
+    def _compile_validate(self, strict=False):
+        name, keys, check_keys = self.name, frozenset(self.value), self.strict or strict
+        children = tuple((key, subt._compile_validate(strict)) for key, subt in self.value.items())
+
+        def validate(config):
+            if not isinstance(config, dict):
+                raise NativeValidationError(dict, config, name)
+            if check_keys and not keys.issuperset(config):
+                raise KeysValidationError(set(config).difference(keys), name)
+            get = config.get
+            for key, check in children:
+                check(get(key))
+        return validate
+
+    def _generate_validate(self, gen, var, strict=False):
+        name = gen.const(self.name)
+        with gen.block('if not isinstance({}, dict)'.format(var)):
+            gen.line('raise NativeValidationError(dict, {}, {})'.format(var, name))
+        if self.strict or strict:
+            keys = gen.const(frozenset(self.value))
+            with gen.block('if not {}.issuperset({})'.format(keys, var)):
+                gen.line('raise KeysValidationError(set({}).difference({}), {})'.format(var, keys, name))
+        for key, subt in self.value.items():
+            child = gen.var()
+            gen.line('{} = {}.get({})'.format(child, var, gen.const(key)))
+            gen.validate(subt, child, strict)
+
+    def _compile_output(self, full=False, strict=False):
+        name, keys, check_keys = self.name, frozenset(self.value), self.strict or strict
+        children = tuple(
+            (key, subt._compile_validate(strict), subt._compile_output(full, strict), subt.example)
+            for key, subt in self.value.items()
+        )
+
+        def output(config):
+            if not isinstance(config, dict):
+                raise NativeValidationError(dict, config, name)
+            extra = not keys.issuperset(config)
+            if extra and check_keys:
+                raise KeysValidationError(set(config).difference(keys), name)
+            result = dict()
+            get = config.get
+            for key, check, out, example in children:
+                value = get(key)
+                if value is None:
+                    check(None)
+                    value = example(full)
+                else:
+                    value = out(value)
+                if value is not None:
+                    result[key] = value
+            if extra:
+                for key, value in config.items():
+                    if value is not None and key not in keys:
+                        result[key] = value
+            return result
+        return output
 
 
 class List(Template):
 
+    __slots__ = ('_dispatch',)
+
     def __init__(self, value, name, strict=False):
         Template.__init__(self, name, strict)
-        self.value = [template(val, '{}[{}]'.format(name, i), strict) for i, val in enumerate(value)]
-
-    def validate(self, config, strict=False):
+        self.value = [self._child(val, '[{}]'.format(i)) for i, val in enumerate(value)]
+        self._dispatch = {}
+
+    def _candidates(self, config, strict=False):
+        """
+        Returns the templates which can accept the first element of the list according to its type,
+        in their original order
+        """
+        if not config or len(self.value) == 1:
+            return self.value
+        try:
+            dispatch = self._dispatch[bool(strict)]
+        except KeyError:
+            dispatch = self._dispatch[bool(strict)] = _dispatch_table(self.value, strict)
+        return dispatch.get(type(config[0]), self.value)
+
+    def _rejected(self, subt, config, strict=False):
+        """
+        Returns the index of the first element of the list the template subt does not accept
+        """
+        for index, element in enumerate(config):
+            if subt.check(element, strict) is not None:
+                return index
+        return None
+
+    def check(self, config, strict=False):
         if not isinstance(config, list):
-            raise NativeValidationError(list, config, self.name)
-        valid = False
-        for subt in self.value:
-            try:
-                for element in config:
-                    subt.validate(element, strict)
-                valid = True
-                return subt
-            except ValidationError:
-                continue
-        if not valid:
-            raise ListValidationError(self.value, config, self.name)
-
-    def example(self, full=False):
+            return NativeValidationError(list, config, self.name)
+        candidates, rejected = self._candidates(config, strict), 0
+        while candidates:
+            index = self._rejected(candidates[0], config, strict)
+            if index is None:
+                return None
+            rejected, element = max(rejected, index), config[index]
+            candidates = [subt for subt in candidates[1:] if subt.check(element, strict) is None]
+        return ListValidationError(self.value, config, self.name, rejected)
+
+    def _collect(self, config, strict, errors, limit, rpath):
+        # the errors of a multi-template list depend on the branch, only its homogeneity is reported
+        if not isinstance(config, list) or len(self.value) > 1:
+            return Template._collect(self, config, strict, errors, limit, rpath)
+        subt = self.value[0]
+        for index, element in enumerate(config):
+            if len(errors) >= limit:
+                return
+            subt._collect(element, strict, errors, limit, (rpath, index))
+
+    def _example(self, full=False):
         return [self.value[0].example()]
 
-    def output(self, config, full=False, strict=False):
-        templ = self.validate(config, strict)
-        return [templ.output(value, full, strict) for value in config]
+    def _random_value(self, generator):
+        return self._random_elements(generator, generator.length())
 
-    def rebuild(self, name, strict):
-        self._name = name
-        self._strict = strict
-        for i, value in self.value:
-            value.rebuild('{}[{}]'.format(name, i), strict)
+    def _random_elements(self, generator, length):
+        """
+        Draws a list of length elements, all from the same template since lists are homogeneous
+        """
+        if not self.value:
+            return []
+        element = generator.random.choice(self.value)
+        return [element._random_value(generator) for _ in range(length)]
 
-    @Template.name.setter
-    def name(self, name):
-        self._name = name
-        for i, value in enumerate(self.value):
-            value.name = '{}[{}]'.format(name, i)
+    def _types(self, strict=False):
+        return frozenset((list,))
+
+    def output(self, config, full=False, strict=False):
+        if not isinstance(config, list):
+            raise NativeValidationError(list, config, self.name)
+        candidates, rejected = self._candidates(config, strict), 0
+        while candidates:
+            subt = candidates[0]
+            try:
+                return [subt.output(element, full, strict) for element in config]
+            except ValidationError:
+                index = self._rejected(subt, config, strict)
+                # an element can be accepted by check and still fail in output, with full=True for instance
+                if index is None:
+                    raise
+            rejected, element = max(rejected, index), config[index]
+            candidates = [subt for subt in candidates[1:] if subt.check(element, strict) is None]
+        raise ListValidationError(self.value, config, self.name, rejected)
+
+    def _children(self):
+        return self.value
+
+    def _replace_children(self, function):
+        self.value = [function(t) for t in self.value]
+        self._dispatch = {}
+
+    def _resolve(self, key, config, strict=False):
+        # the elements of a multi-template list are validated together, since they must share their template
+        if not isinstance(config, list) or len(self.value) != 1:
+            return None
+        if key < len(config):
+            return self.value[0], config[key], strict
+        return _ANYTHING, None, strict
+
+    def _decode(self, decoder, pos, full=False, strict=False):
+        # the branches of a multi-template list can only be chosen once all the elements are known
+        char, pos = decoder.peek(pos)
+        if char != '[' or len(self.value) > 1 or not decoder.holds_objects(self, strict):
+            return Template._decode(self, decoder, pos, full, strict)
+        subt, output = self.value[0], []
+        char, pos = decoder.peek(pos + 1)
+        closed, pos = (True, decoder.skip(pos + 1)) if char == ']' else (False, pos)
+        while not closed:
+            value, pos = subt._decode(decoder, pos, full, strict)
+            output.append(value)
+            closed, pos = decoder.next(pos, ']')
+        return output, pos
+
+    def _iter_output(self, elements, full=False, strict=False):
+        # the elements which have been output cannot be checked again, so every branch
+        # accepting all the elements so far is kept, and the first of them outputs the element
+        candidates = self.value
+        for element in elements:
+            if len(candidates) > 1:
+                candidates = [subt for subt in candidates if subt.check(element, strict) is None] or candidates
+            yield candidates[0].output(element, full, strict)
+
+    def _compile_validate(self, strict=False):
+        name, templates = self.name, self.value
+        checks = [subt._compile_validate(strict) for subt in self.value]
+        if len(checks) == 1:
+            check = checks[0]
+
+            def validate(config):
+                if not isinstance(config, list):
+                    raise NativeValidationError(list, config, name)
+                index = 0
+                try:
+                    for index, element in enumerate(config):
+                        check(element)
+                except ValidationError:
+                    raise ListValidationError(templates, config, name, index)
+            return validate
+
+        dispatch = _dispatch_table(self.value, strict, checks)
+
+        def validate(config):  # pylint: disable=function-redefined
+            if not isinstance(config, list):
+                raise NativeValidationError(list, config, name)
+            if config:
+                rejected = _rejected_index(dispatch.get(type(config[0]), checks), config)
+                if rejected is not None:
+                    raise ListValidationError(templates, config, name, rejected)
+        return validate
+
+    def _generate_validate(self, gen, var, strict=False):
+        name, templates = gen.const(self.name), gen.const(self.value)
+        with gen.block('if not isinstance({}, list)'.format(var)):
+            gen.line('raise NativeValidationError(list, {}, {})'.format(var, name))
+        if len(self.value) == 1:
+            index, element = gen.var(), gen.var()
+            gen.line('{} = 0'.format(index))
+            with gen.block('try'):
+                with gen.block('for {}, {} in enumerate({})'.format(index, element, var)):
+                    gen.validate(self.value[0], element, strict)
+            with gen.block('except ValidationError'):
+                gen.line('raise ListValidationError({}, {}, {}, {})'.format(templates, var, name, index))
+            return
+        # the branches are generated as separate functions, the selection is done by _rejected_index
+        checks = '({},)'.format(', '.join(gen.function(subt, strict) for subt in self.value))
+        rejected = gen.var()
+        gen.line('{} = {}({}, {}) if {} else None'.format(rejected, gen.const(_rejected_index), checks, var, var))
+        with gen.block('if {} is not None'.format(rejected)):
+            gen.line('raise ListValidationError({}, {}, {}, {})'.format(templates, var, name, rejected))
+
+    def _compile_output(self, full=False, strict=False):
+        name, templates = self.name, self.value
+        outs = [subt._compile_output(full, strict) for subt in self.value]
+        checks = [subt._compile_validate(strict) for subt in self.value]
+        branches = list(zip(outs, checks))
+        dispatch = _dispatch_table(self.value, strict, branches)
+
+        def output(config):
+            if not isinstance(config, list):
+                raise NativeValidationError(list, config, name)
+            candidates = dispatch.get(type(config[0]), branches) if config else branches
+            rejected = 0
+            while candidates:
+                out, check = candidates[0]
+                try:
+                    return [out(element) for element in config]
+                except ValidationError:
+                    index = _rejected_index([check], config)
+                    if index is None:
+                        raise
+                rejected, element, remaining = max(rejected, index), config[index], []
+                for other in candidates[1:]:
+                    try:
+                        other[1](element)
+                        remaining.append(other)
+                    except ValidationError:
+                        pass
+                candidates = remaining
+            raise ListValidationError(templates, config, name, rejected)
+        return output
 
     @Template.strict.setter
     def strict(self, strict):
-        self._strict = strict
-        for value in self.value:
-            value.strict = strict
+        self._dispatch = {}
+        Template.strict.fset(self, strict)
 
 
 class Tuple(List):
 
-    def validate(self, config, strict=False):
-        if not isinstance(config, list):
-            raise NativeValidationError(list, config, self.name)
-        if len(self.value) == len(config):
-            for element, subt in zip(config, self.value):
-                subt.validate(element, strict)
-        else:
-            raise SizeValidationError(len(self.value), len(self.value), len(config), self.name)
-
-    def example(self, full=False):
+    __slots__ = ()
+
+    def check(self, config, strict=False):
+        error = self._check_size(config)
+        if error is not None:
+            return error
+        for element, subt in zip(config, self.value):
+            error = subt.check(element, strict)
+            if error is not None:
+                return error
+        return None
+
+    def _collect(self, config, strict, errors, limit, rpath):
+        error = self._check_size(config)
+        if error is not None:
+            errors.append(_with_path(error, rpath))
+            return
+        for index, (element, subt) in enumerate(zip(config, self.value)):
+            if len(errors) >= limit:
+                return
+            subt._collect(element, strict, errors, limit, (rpath, index))
+
+    def _example(self, full=False):
         return [v.example(full) for v in self.value]
 
+    def _random_value(self, generator):
+        return [v._random_value(generator) for v in self.value]
+
     def output(self, config, full=False, strict=False):
-        self.validate(config, strict)
+        error = self._check_size(config)
+        if error is not None:
+            raise error
         return [v.output(e, full, strict) for v, e in zip(self.value, config)]
 
+    def _iter_output(self, elements, full=False, strict=False):
+        return Template._iter_output(self, elements, full, strict)
+
+    def _resolve(self, key, config, strict=False):
+        if not isinstance(config, list):
+            return None
+        if key < min(len(config), len(self.value)):
+            return self.value[key], config[key], strict
+        return _ANYTHING, None, strict
+
+    def _check_container(self, config, strict=False):
+        return self._check_size(config)
+
+    def _decode(self, decoder, pos, full=False, strict=False):
+        return Template._decode(self, decoder, pos, full, strict)
+
+    def _check_size(self, config):
+        if not isinstance(config, list):
+            return NativeValidationError(list, config, self.name)
+        if len(self.value) != len(config):
+            return SizeValidationError(len(self.value), len(self.value), len(config), self.name)
+        return None
+
+    def _compile_validate(self, strict=False):
+        name, length = self.name, len(self.value)
+        checks = tuple(subt._compile_validate(strict) for subt in self.value)
+
+        def validate(config):
+            if not isinstance(config, list):
+                raise NativeValidationError(list, config, name)
+            if len(config) != length:
+                raise SizeValidationError(length, length, len(config), name)
+            for check, element in zip(checks, config):
+                check(element)
+        return validate
+
+    def _generate_validate(self, gen, var, strict=False):
+        name, length = gen.const(self.name), len(self.value)
+        with gen.block('if not isinstance({}, list)'.format(var)):
+            gen.line('raise NativeValidationError(list, {}, {})'.format(var, name))
+        with gen.block('if len({}) != {}'.format(var, length)):
+            gen.line('raise SizeValidationError({0}, {0}, len({1}), {2})'.format(length, var, name))
+        elements = [gen.var() for _ in self.value]
+        if elements:
+            gen.line('{}, = {}'.format(', '.join(elements), var))
+        for subt, element in zip(self.value, elements):
+            gen.validate(subt, element, strict)
+
+    def _compile_output(self, full=False, strict=False):
+        name, length = self.name, len(self.value)
+        outs = tuple(subt._compile_output(full, strict) for subt in self.value)
+
+        def output(config):
+            if not isinstance(config, list):
+                raise NativeValidationError(list, config, name)
+            if len(config) != length:
+                raise SizeValidationError(length, length, len(config), name)
+            return [out(element) for out, element in zip(outs, config)]
+        return output
+
 
 class optional(Template): # pylint: disable=invalid-name
 
+    __slots__ = ()
+
     def __init__(self, value, name=None, strict=False):
         Template.__init__(self, name, strict, value)
 
-    def validate(self, config, strict=False):
+    def check(self, config, strict=False):
         if config is not None:
-            self.value.validate(config, strict)
+            return self.value.check(config, strict)
+        return None
+
+    def _collect(self, config, strict, errors, limit, rpath):
+        if config is not None:
+            self.value._collect(config, strict, errors, limit, rpath)
+
+    def _types(self, strict=False):
+        types = self.value._types(strict)
+        return None if types is None else types.union((type(None),))
 
     def output(self, config, full=False, strict=False):
-        self.validate(config, strict)
         if config is not None:
             return self.value.output(config, full, strict)
         return self.example(full)
 
-    def example(self, full=False):
+    def _decode(self, decoder, pos, full=False, strict=False):
+        if decoder.is_null(pos):
+            return Template._decode(self, decoder, pos, full, strict)
+        return self.value._decode(decoder, pos, full, strict)
+
+    def _resolve(self, key, config, strict=False):
+        return self.value._resolve(key, config, strict)
+
+    def _check_container(self, config, strict=False):
+        return self.value._check_container(config, strict)
+
+    def _example(self, full=False):
         if full:
             return self.value.example(full)
 
+    def _random_value(self, generator):
+        if generator.filled():
+            return self.value._random_value(generator)
+
+    def _generate_validate(self, gen, var, strict=False):
+        with gen.block('if {} is not None'.format(var)):
+            gen.validate(self.value, var, strict)
+
+    def _compile_validate(self, strict=False):
+        check = self.value._compile_validate(strict)
+
+        def validate(config):
+            if config is not None:
+                check(config)
+        return validate
+
+    def _compile_output(self, full=False, strict=False):
+        out, example = self.value._compile_output(full, strict), self.example
+
+        def output(config):
+            if config is not None:
+                return out(config)
+            return example(full)
+        return output
+
 
 # pylint: disable=invalid-name
 class default(optional):
 
+    __slots__ = ('default',)
+
     def __init__(self, value, default_value, name=None, strict=False):
         optional.__init__(self, value, name, strict)
         self.default = default_value
 
-    def example(self, full=False):
+    def _example(self, full=False):
         return self.default
 
     def output(self, config, full=False, strict=False):
@@ -358,45 +1398,243 @@ class default(optional):
             return self.default
         return self.value.output(config, full, strict)
 
+    def _signature(self):
+        return self.strict, self.value, self.default
+
+    def _compile_output(self, full=False, strict=False):
+        out, default_value = self.value._compile_output(full, strict), self.default
+
+        def output(config):
+            if config is None:
+                return default_value
+            return out(config)
+        return output
+
 
 class mixin(Template):
 
+    __slots__ = ('_dispatch',)
+
     def __init__(self, *templates, **kwargs):
         name = kwargs.get('name')
         strict = kwargs.get('strict', False)
         Template.__init__(self, name, strict)
-        self.value = [template(t, name, strict) for t in templates]
+        self.value = [self._child(t) for t in templates]
+        self._dispatch = {}
 
-    def example(self, full=False):
+    def _example(self, full=False):
         return self.value[0].example(full)
 
-    def validate(self, config, strict=False):
-        for t in self.value:
+    def _random_value(self, generator):
+        return generator.branch(self.value)._random_value(generator)
+
+    def _types(self, strict=False):
+        types = [t._types(strict) for t in self.value]
+        if any(accepted is None for accepted in types):
+            return None
+        return frozenset().union(*types)
+
+    def _candidates(self, config, strict=False):
+        """
+        Returns the templates which can accept the value according to its type, in their original order
+        """
+        try:
+            dispatch = self._dispatch[bool(strict)]
+        except KeyError:
+            dispatch = self._dispatch[bool(strict)] = _dispatch_table(self.value, strict)
+        return dispatch.get(type(config), self.value)
+
+    def check(self, config, strict=False):
+        for t in self._candidates(config, strict):
+            if t.check(config, strict) is None:
+                return None
+        return MixinValidationError(self.value, config, self.name)
+
+    def _resolve(self, key, config, strict=False):
+        # only the branch chosen by the type of the value can be followed
+        candidates = self._candidates(config, strict)
+        if len(candidates) != 1:
+            return None
+        return candidates[0]._resolve(key, config, strict)
+
+    def _check_container(self, config, strict=False):
+        return self._candidates(config, strict)[0]._check_container(config, strict)
+
+    def output(self, config, full=False, strict=False):
+        for t in self._candidates(config, strict):
             try:
-                t.validate(config, strict)
-                return t
+                return t.output(config, full, strict)
             except ValidationError:
                 continue
         raise MixinValidationError(self.value, config, self.name)
 
-    def output(self, config, full=False, strict=False):
-        t = self.validate(config, strict)
-        return t.output(config, full, strict)
+    def _compile_validate(self, strict=False):
+        name, templates = self.name, self.value
+        checks = tuple(t._compile_validate(strict) for t in self.value)
+        dispatch = _dispatch_table(self.value, strict, checks)
+
+        def validate(config):
+            for check in dispatch.get(type(config), checks):
+                try:
+                    check(config)
+                    return
+                except ValidationError:
+                    continue
+            raise MixinValidationError(templates, config, name)
+        return validate
+
+    def _generate_validate(self, gen, var, strict=False):
+        error = 'raise MixinValidationError({}, {}, {})'.format(gen.const(self.value), var, gen.const(self.name))
+
+        def branches(templates):
+            if not templates:
+                gen.line(error)
+                return
+            if len(templates) == 1:
+                with gen.block('try'):
+                    gen.validate(templates[0], var, strict)
+                with gen.block('except ValidationError'):
+                    gen.line(error)
+                return
+            valid = gen.first_valid(lambda t=t: gen.validate(t, var, strict) for t in templates)
+            with gen.block('if not {}'.format(valid)):
+                gen.line(error)
+
+        groups = []
+        for json_type, templates in sorted(_dispatch_table(self.value, strict).items(),
+                                           key=lambda item: JSON_TYPES.index(item[0])):
+            if len(templates) == len(self.value):
+                continue
+            for group in groups:
+                if group[0] == templates:
+                    group[1].append(json_type)
+                    break
+            else:
+                groups.append((templates, [json_type]))
+
+        value_type = gen.var()
+        gen.line('{} = type({})'.format(value_type, var))
+        for i, (templates, types) in enumerate(groups):
+            condition = ' or '.join('{} is {}'.format(value_type, gen.const(t)) for t in types)
+            with gen.block(('elif ' if i else 'if ') + condition):
+                branches(templates)
+        if groups:
+            with gen.block('else'):
+                branches(self.value)
+        else:
+            branches(self.value)
+
+    def _compile_output(self, full=False, strict=False):
+        name, templates = self.name, self.value
+        outs = tuple(t._compile_output(full, strict) for t in self.value)
+        dispatch = _dispatch_table(self.value, strict, outs)
+
+        def output(config):
+            for out in dispatch.get(type(config), outs):
+                try:
+                    return out(config)
+                except ValidationError:
+                    continue
+            raise MixinValidationError(templates, config, name)
+        return output
 
-    def rebuild(self, name, strict):
-        self._name = name
-        self._strict = strict
-        for v in self.value:
-            v.rebuild(name, strict)
+    def _children(self):
+        return self.value
 
-    @Template.name.setter
-    def name(self, name):
-        self._name = name
-        for v in self.value:
-            v.name = name
+    def _replace_children(self, function):
+        self.value = [function(t) for t in self.value]
+        self._dispatch = {}
 
     @Template.strict.setter
     def strict(self, strict):
-        self._strict = strict
-        for v in self.value:
-            v.strict = strict
+        self._dispatch = {}
+        Template.strict.fset(self, strict)
+
+
+class _Shared(Template):
+    """
+    The _Shared class is an occurrence of an interned template other than its first one. The shared template
+    keeps the parent of its first occurrence, the errors raised through this occurrence are renamed after it.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, value, key, parent):
+        Template.__init__(self, key, value.strict)
+        self.value = value
+        self._parent = parent
+
+    def _rename(self, error):
+        return _renamed(error, self.value.name, self.name)
+
+    def check(self, config, strict=False):
+        error = self.value.check(config, strict)
+        return None if error is None else self._rename(error)
+
+    def _collect(self, config, strict, errors, limit, rpath):
+        start = len(errors)
+        self.value._collect(config, strict, errors, limit, rpath)
+        for error in errors[start:]:
+            self._rename(error)
+
+    def output(self, config, full=False, strict=False):
+        try:
+            return self.value.output(config, full, strict)
+        except ValidationError as error:
+            raise self._rename(error)
+
+    def _decode(self, decoder, pos, full=False, strict=False):
+        try:
+            return self.value._decode(decoder, pos, full, strict)
+        except ValidationError as error:
+            raise self._rename(error)
+
+    def _types(self, strict=False):
+        return self.value._types(strict)
+
+    def _holds_objects(self, strict=False):
+        return self.value._holds_objects(strict)
+
+    def _resolve(self, key, config, strict=False):
+        resolved = self.value._resolve(key, config, strict)
+        if resolved is None:
+            return None
+        node, value, strict = resolved
+        # the template found under the shared one is named after this occurrence as well
+        prefix = self.value.name
+        if node.name.startswith(prefix):
+            node = _Shared(node, node.name[len(prefix):], self)
+        return node, value, strict
+
+    def _check_container(self, config, strict=False):
+        error = self.value._check_container(config, strict)
+        return None if error is None else self._rename(error)
+
+    def example(self, full=False):
+        return self.value.example(full)
+
+    def _random_value(self, generator):
+        return self.value._random_value(generator)
+
+    def _intern(self, table):
+        return self
+
+    def _compile_validate(self, strict=False):
+        check, rename = self.value._compile_validate(strict), self._rename
+
+        def validate(config):
+            try:
+                check(config)
+            except ValidationError as error:
+                raise rename(error)
+        return validate
+
+    def _compile_output(self, full=False, strict=False):
+        out, rename = self.value._compile_output(full, strict), self._rename
+
+        def output(config):
+            try:
+                return out(config)
+            except ValidationError as error:
+                raise rename(error)
+        return output
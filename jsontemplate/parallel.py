@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This module spreads the validation of batches of values over a pool of worker processes.
+The template is pickled once and sent to each worker when it starts, where it is compiled once.
+The values are then sent by chunks and the results are returned in the order of the values.
+Templates can be pickled as long as the targets of their casts can be imported by the workers.
+"""
+
+from __future__ import unicode_literals
+import multiprocessing
+import pickle
+from itertools import islice
+
+from .exceptions import TemplateTypeError
+
+__all__ = ['validate_parallel', 'output_parallel']
+
+# number of values sent at once to a worker
+CHUNK_SIZE = 1000
+
+# compiled template of the current worker process
+_compiled = None
+
+
+def _initialize(data):
+    global _compiled  # pylint: disable=global-statement
+    _compiled = pickle.loads(data).compile()
+
+
+def _light(error):
+    """
+    Returns the error without the templates of its possible types, which would be pickled along with their parents,
+    that is the whole template, for each error sent back. They are replaced by their description,
+    so that the message of the error is the same.
+    """
+    if error is None or not isinstance(getattr(error, 'possible_types', None), list):
+        return error
+    light = type(error)(['{}'.format(t) for t in error.possible_types], *error.args[1:])
+    light.path = error.path
+    return light
+
+
+def _validate_chunk(args):
+    configs, strict = args
+    return [_light(error) for error in _compiled.validate_many(configs, strict)]
+
+
+def _output_chunk(args):
+    configs, full, strict = args
+    outputs, errors = _compiled.output_many(configs, full, strict)
+    return outputs, [_light(error) for error in errors]
+
+
+def _chunks(configs, chunksize, *args):
+    configs = iter(configs)
+    while True:
+        chunk = list(islice(configs, chunksize))
+        if not chunk:
+            return
+        yield (chunk,) + args
+
+
+def _map(template, function, chunks, workers):
+    try:
+        data = pickle.dumps(template, pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, AttributeError, TypeError) as error:
+        raise TemplateTypeError('{} cannot be sent to worker processes, the targets of its casts '
+                                'must be importable: {}'.format(template.name, error))
+    pool = multiprocessing.Pool(workers, _initialize, (data,))
+    try:
+        results = list(pool.imap(function, chunks))
+    finally:
+        pool.close()
+        pool.join()
+    return results
+
+
+def validate_parallel(template, configs, strict=False, workers=None, chunksize=CHUNK_SIZE):
+    """
+    Validates a batch of values in a pool of worker processes
+
+    :param template: the template validating the values
+    :param configs: iterable of values to validate
+    :param workers: number of worker processes, defaults to the number of CPUs
+    :param chunksize: number of values sent at once to a worker
+    :return: list with, for each value, None if it is valid or the ValidationError describing why it isn't
+    """
+    errors = []
+    for chunk in _map(template, _validate_chunk, _chunks(configs, chunksize, strict), workers):
+        errors.extend(chunk)
+    return errors
+
+
+def output_parallel(template, configs, full=False, strict=False, workers=None, chunksize=CHUNK_SIZE):
+    """
+    Validates and outputs a batch of values in a pool of worker processes
+
+    :param template: the template validating the values
+    :param configs: iterable of values to output
+    :param workers: number of worker processes, defaults to the number of CPUs
+    :param chunksize: number of values sent at once to a worker
+    :return: (outputs, errors) lists with, for each value, either its output and None,
+             or None and the ValidationError raised by the value
+    """
+    outputs, errors = [], []
+    for chunk in _map(template, _output_chunk, _chunks(configs, chunksize, full, strict), workers):
+        outputs.extend(chunk[0])
+        errors.extend(chunk[1])
+    return outputs, errors
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This module applies JSON Patches (RFC 6902) to documents without modifying them, and keeps track of the values
+the patches touched, so that a template only validates or outputs these values instead of the whole document.
+"""
+
+from __future__ import unicode_literals
+from copy import copy, deepcopy
+
+from .exceptions import PatchValidationError, short_repr
+
+__all__ = ['DocumentPatch', 'parse_pointer']
+
+_OPERATIONS = frozenset(('add', 'remove', 'replace', 'move', 'copy', 'test'))
+
+
+class _Invalid(Exception):
+    """
+    Raised by the steps of an operation which cannot be applied, with the reason why
+    """
+
+
+def parse_pointer(pointer):
+    """
+    Returns the unescaped reference tokens of a JSON Pointer, the empty list for the whole document
+    """
+    if pointer == '':
+        return []
+    if not isinstance(pointer, type('')) or not pointer.startswith('/'):
+        raise _Invalid('{} is not a JSON pointer'.format(short_repr(pointer)))
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer.split('/')[1:]]
+
+
+class DocumentPatch(object):
+    """
+    The DocumentPatch class applies the operations of JSON Patches to a document. The document itself is not
+    modified: the objects and arrays along the patched paths are copied, the other ones are shared with it,
+    and the values of the patches are copied before being put in the document.
+
+    Each value added, replaced or removed is recorded in touched, as a [path, removed] pair where path is the list
+    of the keys and indices leading to the value. The indices of the paths are shifted by the insertions
+    and removals of array elements which follow them, so that they always point to the same values.
+    """
+
+    def __init__(self, document):
+        self.document = document
+        self.touched = []
+        # the containers copied by the patch, by id, which can be modified in place
+        self._owned = {}
+
+    def apply(self, patch):
+        """
+        Applies the operations of the patch in order
+
+        :param patch: list of operations, dicts with op and path keys, and value or from keys depending on op
+        :return: self
+        :raise PatchValidationError: if an operation cannot be applied
+        """
+        if not isinstance(patch, list):
+            raise PatchValidationError(patch, 'a patch should be a list of operations')
+        for operation in patch:
+            try:
+                self._apply(operation)
+            except _Invalid as error:
+                raise PatchValidationError(operation, error.args[0])
+        return self
+
+    def _apply(self, operation):
+        if not isinstance(operation, dict) or operation.get('op') not in _OPERATIONS:
+            raise _Invalid('unknown operation')
+        kind, path = operation['op'], parse_pointer(operation.get('path'))
+        if kind == 'remove':
+            return self._remove(path)
+        if kind in ('move', 'copy'):
+            source = parse_pointer(operation.get('from'))
+            value = self._get(source)
+            if kind == 'copy':
+                return self._add(path, deepcopy(value))
+            if path[:len(source)] == source and len(path) > len(source):
+                raise _Invalid('a value cannot be moved into itself')
+            self._remove(source)
+            return self._add(path, value)
+        if 'value' not in operation:
+            raise _Invalid('the value is missing')
+        if kind == 'test':
+            if self._get(path) != operation['value']:
+                raise _Invalid('the value is {}'.format(short_repr(self._get(path))))
+            return None
+        value = deepcopy(operation['value'])
+        return self._add(path, value) if kind == 'add' else self._replace(path, value)
+
+    @staticmethod
+    def _key(container, token, append=False):
+        """
+        Returns the key or index of the container designated by a token
+
+        :param append: if True, the token can designate the end of an array
+        """
+        if isinstance(container, dict):
+            return token
+        if isinstance(container, list):
+            if append and token == '-':
+                return len(container)
+            if token.isdigit() and (token == '0' or not token.startswith('0')) and \
+                    int(token) < len(container) + append:
+                return int(token)
+            raise _Invalid('{} is not an index of the array'.format(token))
+        raise _Invalid('{} is neither an object nor an array'.format(short_repr(container)))
+
+    def _get(self, tokens):
+        value = self.document
+        for token in tokens:
+            key = self._key(value, token)
+            if isinstance(value, dict) and key not in value:
+                raise _Invalid('the key {} is missing'.format(key))
+            value = value[key]
+        return value
+
+    def _writable(self, container):
+        """
+        Returns a copy of the container that the patch can modify, unless it is already one
+        """
+        if id(container) in self._owned:
+            return container
+        if not isinstance(container, (dict, list)):
+            raise _Invalid('{} is neither an object nor an array'.format(short_repr(container)))
+        container = copy(container)
+        self._owned[id(container)] = container
+        return container
+
+    def _parent(self, tokens):
+        """
+        Returns the writable container of the value designated by tokens, and the path of the container
+        """
+        container = self.document = self._writable(self.document)
+        path = []
+        for token in tokens[:-1]:
+            key = self._key(container, token)
+            if isinstance(container, dict) and key not in container:
+                raise _Invalid('the key {} is missing'.format(key))
+            child = container[key] = self._writable(container[key])
+            container = child
+            path.append(key)
+        return container, path
+
+    def _add(self, tokens, value):
+        if not tokens:
+            return self._replace(tokens, value)
+        container, path = self._parent(tokens)
+        key = self._key(container, tokens[-1], append=True)
+        if isinstance(container, list):
+            container.insert(key, value)
+            self._shift(path, key, 1)
+        else:
+            container[key] = value
+        self.touched.append([path + [key], False])
+        return None
+
+    def _replace(self, tokens, value):
+        if not tokens:
+            self.document = value
+            self.touched = [[[], False]]
+            return None
+        container, path = self._parent(tokens)
+        key = self._key(container, tokens[-1])
+        if isinstance(container, dict) and key not in container:
+            raise _Invalid('the key {} is missing'.format(key))
+        container[key] = value
+        self.touched.append([path + [key], False])
+        return None
+
+    def _remove(self, tokens):
+        if not tokens:
+            raise _Invalid('the whole document cannot be removed')
+        container, path = self._parent(tokens)
+        key = self._key(container, tokens[-1])
+        if isinstance(container, dict) and key not in container:
+            raise _Invalid('the key {} is missing'.format(key))
+        del container[key]
+        if isinstance(container, list):
+            self._shift(path, key, -1)
+        self.touched.append([path + [key], True])
+        return None
+
+    def _shift(self, path, index, step):
+        """
+        Shifts the touched paths going through the elements of the array at path which follow index,
+        after an insertion (step 1) or a removal (step -1) at index, and forgets the removed element
+        """
+        depth, touched = len(path), []
+        for entry in self.touched:
+            touched_path = entry[0]
+            if len(touched_path) > depth and touched_path[:depth] == path and \
+                    isinstance(touched_path[depth], int) and touched_path[depth] >= index:
+                if step < 0 and touched_path[depth] == index:
+                    continue
+                touched_path[depth] += step
+            touched.append(entry)
+        self.touched = touched
+
+    def paths(self):
+        """
+        Returns the (path, removed) pairs of the touched values, in the order they were first touched,
+        without the duplicates nor the values nested in another touched value, which is validated as a whole.
+        The removals of array elements do not cover the paths under them, which point to the following elements.
+        """
+        latest, order = {}, []
+        for path, removed in self.touched:
+            path = tuple(path)
+            if path not in latest:
+                order.append(path)
+            latest[path] = removed
+        covering = {path for path, removed in latest.items() if not (removed and isinstance(path[-1], int))}
+        return [
+            (list(path), latest[path]) for path in order
+            if not any(path[:depth] in covering for depth in range(len(path)))
+        ]
+
+    def set(self, path, value):
+        """
+        Replaces the value at path, given with the keys and indices of touched, in the patched document.
+        Setting a key of an object to None removes it.
+        """
+        if not path:
+            self.document = value
+            return
+        container = self.document = self._writable(self.document)
+        for key in path[:-1]:
+            child = container[key] = self._writable(container[key])
+            container = child
+        if value is None and isinstance(container, dict):
+            container.pop(path[-1], None)
+        else:
+            container[path[-1]] = value
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This module measures where the time goes when a template validates or outputs values.
+While a Profile is active, each node of the template is switched to a subclass of its class whose methods
+count their calls and time, and the nodes get their class back when it ends, so that templates which are not
+being profiled do not pay anything for it.
+"""
+
+from __future__ import unicode_literals, division
+import time
+
+from .exceptions import ValidationError
+
+__all__ = ['Profile']
+
+timer = getattr(time, 'perf_counter', time.time)  # pylint: disable=invalid-name
+
+# methods counted by the profile, the other ones are run as part of them
+_METHODS = ('check', 'output', '_collect', '_decode')
+
+# methods running the target of the casts
+_CASTS = ('_cast', '_fallback')
+
+
+def _branches(node):
+    """
+    Returns the indices of the mixin branches leading to the node, from the root of the template.
+    The branches of a mixin are named after it, the indices tell apart the nodes of the different branches.
+    """
+    branches = []
+    while node._parent is not None:
+        parent = node._parent
+        if node._key == '' and isinstance(parent.value, list):
+            branches.append(next(index for index, child in enumerate(parent.value) if child is node))
+        node = parent
+    branches.reverse()
+    return tuple(branches)
+
+
+class Profile(object):
+    """
+    The Profile class records, for each node of a template, the number of calls of its validation and output
+    methods, their cumulative time, the number of failures, that is the values it rejected, including the branches
+    of lists and mixins which were tried without success, and the number of times the targets of casts were called.
+    Calls of a node nested in another call of the same node are part of the outer call.
+    The stats are keyed by the name and class of the nodes, and the indices of the mixin branches leading to them.
+
+    Only the methods of the templates are profiled, not compiled templates, and the template should not be
+    compiled nor pickled while the profile is active, nor used by other threads.
+
+        with config_template.profile() as profile:
+            config_template.validate(config)
+        print(profile.report())
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self.stats = {}
+        self._records = {}
+        self._nodes = []
+        self._classes = {}
+        self._active = set()
+
+    def __enter__(self):
+        nodes, seen = [self.template], set()
+        for node in nodes:
+            # interned templates may appear several times in the tree
+            if id(node) not in seen:
+                seen.add(id(node))
+                self._nodes.append((node, type(node)))
+                nodes.extend(node._children())
+        for node, cls in self._nodes:
+            node.__class__ = self._instrumented(cls)
+        return self
+
+    def __exit__(self, *exc_info):
+        for node, cls in self._nodes:
+            node.__class__ = cls
+        self._nodes = []
+
+    def _instrumented(self, cls):
+        """
+        Returns the subclass of cls whose methods are measured, with the same name so that fingerprints do not change
+        """
+        try:
+            return self._classes[cls]
+        except KeyError:
+            attributes = {'__slots__': (), '__module__': cls.__module__}
+            for method in _METHODS:
+                attributes[method] = self._timed(getattr(cls, method), method == 'check')
+            for method in _CASTS:
+                if hasattr(cls, method):
+                    attributes[method] = self._counted(getattr(cls, method))
+            instrumented = self._classes[cls] = type(cls.__name__, (cls,), attributes)
+            return instrumented
+
+    def _record(self, node):
+        """
+        Returns the stats of the node, which are shared by the nodes of the same name, class and mixin branches
+        """
+        try:
+            return self._records[id(node)]
+        except KeyError:
+            key = node.name, type(node).__name__, _branches(node)
+            stats = self._records[id(node)] = self.stats.setdefault(
+                key, {'calls': 0, 'time': 0.0, 'failures': 0, 'casts': 0})
+            return stats
+
+    def _timed(self, method, returns_error):
+        active = self._active
+
+        def timed(node, *args, **kwargs):
+            if id(node) in active:
+                return method(node, *args, **kwargs)
+            stats = self._record(node)
+            active.add(id(node))
+            start = timer()
+            try:
+                result = method(node, *args, **kwargs)
+            except ValidationError:
+                stats['failures'] += 1
+                raise
+            finally:
+                stats['time'] += timer() - start
+                stats['calls'] += 1
+                active.discard(id(node))
+            if returns_error and result is not None:
+                stats['failures'] += 1
+            return result
+        return timed
+
+    def _counted(self, method):
+        def counted(node, *args, **kwargs):
+            self._record(node)['casts'] += 1
+            return method(node, *args, **kwargs)
+        return counted
+
+    def report(self, limit=None):
+        """
+        Returns a table of the stats of the nodes, the slowest first
+
+        :param limit: maximum number of nodes in the table, None for all of them
+        """
+        rows = sorted(self.stats.items(), key=lambda item: item[1]['time'], reverse=True)[:limit]
+        lines = ['{:>10} {:>12} {:>10} {:>10}  {}'.format('calls', 'time (ms)', 'failures', 'casts', 'template')]
+        for (name, kind, branches), stats in rows:
+            lines.append('{:>10} {:>12.3f} {:>10} {:>10}  {} <{}>{}'.format(
+                stats['calls'], stats['time'] * 1000, stats['failures'], stats['casts'], name, kind,
+                ' branch {}'.format('.'.join(str(branch) for branch in branches)) if branches else ''))
+        return '\n'.join(lines)
@@ -0,0 +1,370 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+This module decodes JSON documents incrementally from files.
+The file is read by chunks and each value is decoded by the json module as soon as it is complete,
+so that only the value being decoded and the current chunk are in memory.
+JSON Lines files, where each line is a JSON value, are decoded line by line.
+Whole documents can also be decoded straight from memory-mapped files and binary buffers.
+"""
+
+from __future__ import unicode_literals
+import codecs
+import io
+import json
+import mmap
+import os
+import re
+from itertools import islice
+from json.decoder import scanstring
+
+from .exceptions import ValidationError, TemplateValueError
+
+__all__ = ['load_json', 'loads_json', 'TemplateDecoder', 'iter_array', 'iter_array_file', 'LinesLoader']
+
+# number of characters read at once from the file
+BUFFER_SIZE = 1 << 16
+
+# number of bytes buffered when reading JSON Lines files
+LINES_BUFFER_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# the empty string is in _SPACES too, so the end of the text goes through the regular expression
+_SPACES = ' \t\n\r'
+
+# characters which can follow a complete element of an array
+_DELIMITERS = frozenset(',]} \t\n\r')
+
+# python3 compatibility testing
+try:
+    unicode('hello')  # pylint: disable=invalid-name
+except NameError:
+    unicode = str  # pylint: disable=invalid-name,redefined-builtin
+
+
+try:
+    from json import detect_encoding as _detect_encoding
+except ImportError:  # python 2
+    def _detect_encoding(data):
+        """
+        Tells the encoding of a JSON text from its first bytes, as json.loads does with bytes
+        """
+        data = bytearray(data)
+        if data.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        if data.startswith((codecs.BOM_UTF32_BE, codecs.BOM_UTF32_LE)):
+            return 'utf-32'
+        if data.startswith((codecs.BOM_UTF16_BE, codecs.BOM_UTF16_LE)):
+            return 'utf-16'
+        if len(data) >= 4:
+            if not data[0]:
+                return 'utf-16-be' if data[1] else 'utf-32-be'
+            if not data[1]:
+                return 'utf-16-le' if data[2] or data[3] else 'utf-32-le'
+        elif len(data) == 2:
+            if not data[0]:
+                return 'utf-16-be'
+            if not data[1]:
+                return 'utf-16-le'
+        return 'utf-8'
+
+
+def _text(data):
+    if isinstance(data, unicode):
+        return data
+    # UTF-16 and UTF-32 texts are told apart by their first bytes, the way json.loads does
+    return codecs.decode(data, _detect_encoding(bytearray(data[:4])))
+
+
+def loads_json(data):
+    """
+    Decodes a JSON document given as text, or as UTF-8, UTF-16 or UTF-32 bytes, bytearray, memoryview or mmap.
+    Binary data is decoded straight from its buffer, without being copied to bytes first.
+    """
+    return json.loads(_text(data))
+
+
+def load_json(filepath, memory_map=False):
+    """
+    Decodes the JSON document contained in an UTF-8, UTF-16 or UTF-32 file
+
+    :param memory_map: if True, the text is decoded from a memory mapping of the file
+                       instead of being read into bytes first
+    """
+    with open(filepath, 'rb') as data:
+        if memory_map and os.fstat(data.fileno()).st_size:
+            mapped = mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                text = _text(mapped)
+            finally:
+                mapped.close()
+        else:
+            text = _text(data.read())
+    return json.loads(text)
+
+
+class TemplateDecoder(object):
+    """
+    The TemplateDecoder class decodes a JSON text with a template driving the parser.
+    Positions given to and returned by its methods are always past the whitespace.
+    The templates which support it parse their objects and arrays through the decoder key by key and element
+    by element, so that a value is rejected as soon as it is decoded, before the rest of the text is.
+    The other values are decoded at once by the json module and then output by their template.
+    """
+
+    def __init__(self, data):
+        self.text = _text(data)
+        self._scan = json.JSONDecoder().scan_once
+        self._holds_objects = {}
+
+    def decode(self, template, full=False, strict=False):
+        value, pos = template._decode(self, self.skip(0), full, strict)
+        if self.skip(pos) != len(self.text):
+            raise self.error('Extra data', pos)
+        return value
+
+    def holds_objects(self, template, strict=False):
+        """
+        Tells if the template should decode its value piece by piece, see Template._holds_objects
+        """
+        key = id(template), bool(strict)
+        try:
+            return self._holds_objects[key]
+        except KeyError:
+            holds = self._holds_objects[key] = template._holds_objects(strict)
+            return holds
+
+    def skip(self, pos):
+        if self.text[pos:pos + 1] in _SPACES:
+            return _WHITESPACE.match(self.text, pos).end()
+        return pos
+
+    def peek(self, pos):
+        """
+        Skips the whitespace and returns the next character, or an empty string at the end of the text, and its position
+        """
+        char = self.text[pos:pos + 1]
+        if char in _SPACES:
+            pos = _WHITESPACE.match(self.text, pos).end()
+            char = self.text[pos:pos + 1]
+        return char, pos
+
+    def is_null(self, pos):
+        return self.text.startswith('null', pos)
+
+    def value(self, pos):
+        """
+        Decodes the value at the position pos with the json module
+
+        :return: (value, position following the value and its whitespace)
+        """
+        try:
+            value, pos = self._scan(self.text, pos)
+        except StopIteration as error:
+            # the scanner of python 2 does not tell where the value is
+            raise self.error('Expecting value', error.args[0] if error.args else pos)
+        return value, self.skip(pos)
+
+    def key(self, pos):
+        """
+        Decodes the key of an object at the position pos and the colon following it
+
+        :return: (key, position of its value)
+        """
+        if self.text[pos:pos + 1] != '"':
+            raise self.error('Expecting property name enclosed in double quotes', pos)
+        key, pos = scanstring(self.text, pos + 1)
+        char, pos = self.peek(pos)
+        if char != ':':
+            raise self.error("Expecting ':' delimiter", pos)
+        return key, self.skip(pos + 1)
+
+    def next(self, pos, closing):
+        """
+        Reads the delimiter following an element of an object or an array
+
+        :return: (True if the closing character was reached, position following the delimiter and its whitespace)
+        """
+        char, pos = self.peek(pos)
+        if char == closing:
+            return True, self.skip(pos + 1)
+        if char != ',':
+            raise self.error("Expecting ',' delimiter or '{}'".format(closing), pos)
+        return False, self.skip(pos + 1)
+
+    @staticmethod
+    def error(message, pos):
+        return ValueError('{}: char {}'.format(message, pos))
+
+
+class _Buffer(object):
+    """
+    The _Buffer class holds the part of the file which has been read but not decoded yet
+    """
+
+    def __init__(self, fileobj, size=BUFFER_SIZE):
+        self.fileobj = fileobj
+        self.size = size
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def read(self):
+        """
+        Reads the next chunk of the file, dropping the decoded text.
+        The chunk is at least as large as the text not decoded yet, so that decoding
+        a value spanning many chunks does not restart from its beginning more than a few times.
+
+        :return: False at the end of the file
+        """
+        chunk = self.fileobj.read(max(self.size, len(self.text) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skips the whitespace and returns the next character, or an empty string at the end of the file
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.read():
+                return ''
+
+    def decode(self, decoder):
+        """
+        Decodes the next value, reading the file until the value is complete
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+                # a number is only complete once it is followed by a delimiter, 1. or 1e may continue with the next chunk
+                if self.eof or self.text[end:end + 1] in _DELIMITERS:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self.read()
+
+
+def iter_array(fileobj, buffer_size=BUFFER_SIZE):
+    """
+    Yields one at a time the elements of the JSON array contained in a text file
+
+    :param fileobj: file object opened in text mode
+    :param buffer_size: number of characters read at once from the file
+    :raise ValueError: if the file does not contain a JSON array
+    """
+    buffer = _Buffer(fileobj, buffer_size)
+    decoder = json.JSONDecoder()
+    if buffer.peek() != '[':
+        raise ValueError('Expecting a JSON array')
+    buffer.pos += 1
+    if buffer.peek() == ']':
+        buffer.pos += 1
+    else:
+        while True:
+            yield buffer.decode(decoder)
+            char = buffer.peek()
+            buffer.pos += 1
+            if char == ']':
+                break
+            if char != ',':
+                raise ValueError("Expecting ',' delimiter or ']' after an element of the JSON array")
+    if buffer.peek():
+        raise ValueError('Extra data after the JSON array')
+
+
+def iter_array_file(filepath, buffer_size=BUFFER_SIZE):
+    """
+    Yields one at a time the elements of the JSON array contained in an UTF-8 file, see iter_array
+    """
+    with io.open(filepath, encoding='utf-8') as fileobj:
+        for element in iter_array(fileobj, buffer_size):
+            yield element
+
+
+class LinesLoader(object):
+    """
+    The LinesLoader class iterates over the valid lines of a JSON Lines file, yielding their line number
+    and their output. The file is read through a large buffer and each line is decoded on its own.
+    Once the iteration is over, the rejected lines are summarized by the accepted, rejected and rejects attributes,
+    which are reset when the loader is iterated again.
+
+    on_error tells what to do with the lines which are not valid JSON or are rejected by the template:
+        - collect: the line number and the error of the rejected lines are kept in the rejects list
+        - skip: the rejected lines are only counted
+        - raise: the error is raised, line_number is then the number of the rejected line
+    """
+
+    on_errors = ('collect', 'skip', 'raise')
+
+    def __init__(self, output, source, on_error='collect', buffer_size=LINES_BUFFER_SIZE):
+        """
+        :param output: function validating and outputting the value of a line
+        :param source: path of the file, or file object opened in text mode
+        """
+        if on_error not in self.on_errors:
+            raise TemplateValueError('on_error must be one of {}, not {!r}'.format(
+                ', '.join(self.on_errors), on_error))
+        self.output = output
+        self.source = source
+        self.on_error = on_error
+        self.buffer_size = buffer_size
+        self.line_number = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.rejects = []
+
+    def __iter__(self):
+        # every iteration reads the source again, its summary starts over
+        self.line_number = self.accepted = self.rejected = 0
+        self.rejects = []
+        if hasattr(self.source, 'read'):
+            return self._iter_lines(self.source)
+        return self._iter_file()
+
+    def _iter_file(self):
+        with io.open(self.source, encoding='utf-8', buffering=self.buffer_size) as lines:
+            for result in self._iter_lines(lines):
+                yield result
+
+    def _iter_lines(self, lines):
+        output, loads, collect = self.output, json.loads, self.on_error == 'collect'
+        for self.line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                value = output(loads(line))
+            except (ValueError, ValidationError) as error:
+                if self.on_error == 'raise':
+                    raise
+                self.rejected += 1
+                if collect:
+                    self.rejects.append((self.line_number, error))
+                continue
+            self.accepted += 1
+            yield self.line_number, value
+
+    def summary(self):
+        """
+        Returns a short description of the accepted and rejected lines
+        """
+        text = '{} lines accepted, {} rejected'.format(self.accepted, self.rejected)
+        if self.rejects:
+            numbers = [str(number) for number, _ in islice(self.rejects, 11)]
+            if len(numbers) > 10:
+                numbers[10] = '...'
+            text += ' (lines {})'.format(', '.join(numbers))
+        return text
+
+    def __repr__(self):
+        return '<LinesLoader {!r}: {}>'.format(self.source, self.summary())
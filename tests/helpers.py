@@ -0,0 +1,74 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from jsontemplate import optional, default, mixin, size, starcast, kwcast, cast, enum, strict
+from jsontemplate.native import Native
+
+
+class Counted(Native):
+    """
+    Native template appending the values it checks and outputs to calls, to count the values a template reaches
+    """
+
+    def __init__(self, value, name, calls, strict=False):
+        Native.__init__(self, value, name, strict)
+        self.calls = calls
+
+    def check(self, config, strict=False):
+        self.calls.append(config)
+        return Native.check(self, config, strict)
+
+    def output(self, config, full=False, strict=False):
+        self.calls.append(config)
+        return Native.output(self, config, full, strict)
+
+
+class Animal:
+
+    def __init__(self, name, age, specie='dog'):
+        self.name = name
+        self.age = int(age)
+        self.specie = specie
+
+    def __eq__(self, other):
+        return isinstance(other, Animal) and vars(self) == vars(other)
+
+
+# template reaching every kind of template, shared by the tests running whole documents through several engines
+DICT_TEMPLATE = {
+    "first_name": str,
+    "last_name": str,
+    "age": cast(int, {int, str}),
+    "nickname": optional(str),
+    "country": 'France',
+    "animals": size([{
+        "name": str,
+        "age": int,
+        "specie": enum('cat', 'dog'),
+    }], min_value=1, max_value=3),
+    "pet": mixin(starcast(Animal, (str, int)), kwcast(Animal, {'name': str, 'age': int}), str),
+    "location": (str, int),
+    "scores": default([{float, int}], []),
+    "values": [float, int],
+    "extra": strict({'a': int}),
+}
+
+# valid document of DICT_TEMPLATE
+DOCUMENT = """{
+    "first_name": "Adrien",
+    "last_name": "El Zein",
+    "age": "25",
+    "animals": [{
+        "name": "kupa",
+        "age": 8,
+        "specie": "cat"
+    }],
+    "pet": ["medor", 3],
+    "location": ["Paris", 75001],
+    "scores": [0.34, 0.54, 50],
+    "values": [1, 2, 3],
+    "extra": {"a": 1},
+    "unknown": true
+}"""
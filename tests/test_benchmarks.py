@@ -0,0 +1,48 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks import run
+
+
+class BenchmarkTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_run(self):
+        results = run.run(sorted(run.BENCHMARKS), 20, 3)
+        self.assertSetEqual(set(results), set(run.BENCHMARKS))
+        for result in results.values():
+            self.assertGreater(result['ops'], 0)
+            self.assertLessEqual(result['p50'], result['p99'])
+
+    def test_compare(self):
+        baseline = {'validate': {'ops': 100.0, 'peak': 1000.0}, 'output': {'ops': 100.0, 'peak': None}}
+        self.assertListEqual(run.compare({'validate': {'ops': 90.0, 'peak': 1100.0}}, baseline), [])
+        self.assertEqual(len(run.compare({'validate': {'ops': 70.0, 'peak': 1000.0}}, baseline)), 1)
+        self.assertEqual(len(run.compare({'validate': {'ops': 70.0, 'peak': 2000.0}}, baseline)), 2)
+        self.assertListEqual(run.compare({'validate': {'ops': 100.0, 'peak': 1.0}},
+                                         {'validate': {'ops': 100.0, 'peak': 0.5}}), [])
+        self.assertListEqual(run.compare({'output': {'ops': 50.0, 'peak': 1.0}, 'new': {'ops': 1.0, 'peak': 1.0}},
+                                         baseline, tolerance=0.6), [])
+
+    def test_baseline(self):
+        path = os.path.join(self.directory, 'baseline.json')
+        options = ['-k', 'nested', '--scale', '0.01', '--repeat', '2', '--baseline', path]
+        self.assertEqual(run.main(options + ['--save-baseline']), 0)
+        with open(path) as baseline:
+            self.assertSetEqual(set(json.load(baseline)['results']), {'build_nested', 'validate_nested'})
+        self.assertIn(run.main(options), (0, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+import threading
+import unittest
+import uuid
+
+from jsontemplate import template, optional, default, cast
+from jsontemplate.cache import ENTRY_OVERHEAD
+from jsontemplate.exceptions import *
+from helpers import Counted
+
+
+class CacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.template = template({'id': Counted(int, 'id', self.calls), 'tags': [str], 'nickname': optional(str),
+                                  'age': default(int, 3)})
+        self.cache = self.template.cached()
+
+    def test_output(self):
+        document = {'id': 1, 'tags': ['a', 'b']}
+        first = self.cache.output(document)
+        second = self.cache.output({'id': 1, 'tags': ['a', 'b']})
+        self.assertEqual(first, {'id': 1, 'tags': ['a', 'b'], 'age': 3})
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.calls), 1)
+        second['tags'].append('c')
+        self.assertListEqual(self.cache.output(document)['tags'], ['a', 'b'])
+        self.assertEqual(self.cache.output(document, full=True)['nickname'], 'example')
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.cache.stats()['hits'], 2)
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+    def test_exact_values(self):
+        self.cache.output({'id': 1, 'tags': []})
+        self.cache.output({'id': True, 'tags': []})
+        self.assertRaises(NativeValidationError, self.cache.output, {'id': 1, 'tags': ()})
+        reordered = {'tags': [], 'id': 1}
+        self.cache.output(reordered)
+        # the outputs keep the order of the keys, a document whose keys come in another order is another entry
+        self.assertEqual(self.cache.stats()['misses'], 3 if list(reordered) == ['id', 'tags'] else 4)
+
+    def test_errors(self):
+        document = {'id': 'a', 'tags': []}
+        errors = []
+        for _ in range(2):
+            with self.assertRaises(NativeValidationError) as context:
+                self.cache.output(document)
+            errors.append(context.exception)
+        self.assertIsNot(errors[0], errors[1])
+        self.assertEqual(str(errors[0]), str(errors[1]))
+        self.assertEqual(len(self.calls), 1)
+        self.assertIsInstance(self.cache.check(document), NativeValidationError)
+        self.assertIsInstance(self.cache.check(document), NativeValidationError)
+        self.assertRaises(NativeValidationError, self.cache.validate, document)
+        self.assertFalse(self.cache.is_valid(document))
+        self.assertTrue(self.cache.is_valid({'id': 1, 'tags': []}))
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(len(self.cache.validate(document, max_errors=5)), 1)
+
+    def test_error_copies(self):
+        # the errors of the misses are not the cached ones either, and the cached ones hold no traceback
+        with self.assertRaises(NativeValidationError) as context:
+            self.cache.output({'id': 'a', 'tags': []})
+        context.exception.path = ('changed',)
+        self.assertIsNone(getattr(context.exception, '__context__', None))
+        (_, error), _ = list(self.cache._entries.values())[0]
+        self.assertIsNone(getattr(error, '__traceback__', None))
+        with self.assertRaises(NativeValidationError) as context:
+            self.cache.output({'id': 'a', 'tags': []})
+        self.assertIsNone(context.exception.path)
+        first = self.cache.check({'id': 'b', 'tags': []})
+        first.path = ('changed',)
+        self.assertIsNone(self.cache.check({'id': 'b', 'tags': []}).path)
+
+    def test_error_values(self):
+        # the cached errors share the invalid values neither with the documents nor with the copies handed out
+        cached = template({'v': [int]}).cached()
+        document = {'v': [1, 2, 'x']}
+        message = str(cached.check(document))
+        del document['v'][:]
+        error = cached.check({'v': [1, 2, 'x']})
+        self.assertEqual(str(error), message)
+        error.actual_values.append(3)
+        self.assertEqual(cached.check({'v': [1, 2, 'x']}).args[1], [1, 2, 'x'])
+        document = {'v': [1, 2, 'x']}
+        self.assertRaises(ListValidationError, cached.output, document)
+        document['v'][2] = 3
+        with self.assertRaises(ListValidationError) as context:
+            cached.output({'v': [1, 2, 'x']})
+        self.assertEqual(str(context.exception), message)
+
+    def test_strict(self):
+        document = {'id': 1, 'tags': [], 'other': 1}
+        self.assertIsNone(self.cache.check(document))
+        self.assertIsInstance(self.cache.check(document, strict=True), KeysValidationError)
+        self.assertRaises(KeysValidationError, self.cache.output, document, strict=True)
+        self.assertEqual(self.cache.output(document)['other'], 1)
+
+    def test_eviction(self):
+        cache = self.template.cached(max_bytes=(ENTRY_OVERHEAD + 100) * 3)
+        for i in range(10):
+            cache.output({'id': i, 'tags': []})
+        stats = cache.stats()
+        self.assertEqual(stats['entries'] + stats['evictions'], 10)
+        self.assertTrue(stats['bytes'] <= cache.max_bytes)
+        self.assertTrue(0 < stats['entries'] < 10)
+        cache.output({'id': 9, 'tags': []})
+        self.assertEqual(cache.stats()['hits'], 1)
+        cache.output({'id': 0, 'tags': []})
+        self.assertEqual(cache.stats()['hits'], 1)
+        cache.clear()
+        self.assertEqual(cache.stats(), {'hits': 0, 'misses': 0, 'bypassed': 0, 'evictions': 0,
+                                         'entries': 0, 'bytes': 0})
+
+    def test_objects(self):
+        cached = template({'id': cast(uuid.UUID, str)}).compile().cached()
+        document = {'id': str(uuid.UUID(int=1))}
+        output = cached.output(document)
+        self.assertEqual(cached.output(document), output)
+        self.assertIsNot(cached.output(document), output)
+        self.assertEqual(cached.output({'id': uuid.UUID(int=1)}), output)
+        self.assertEqual(cached.stats()['bypassed'], 1)
+        self.assertEqual(cached.stats()['hits'], 2)
+
+    def test_threads(self):
+        documents = [{'id': i % 10, 'tags': ['a']} for i in range(1000)]
+
+        def run():
+            for document in documents:
+                self.assertEqual(self.cache.output(document)['id'], document['id'])
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'] + stats['misses'], 4000)
+        self.assertEqual(stats['entries'], 10)
+
+if __name__ == '__main__':
+    unittest.main()
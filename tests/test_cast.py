@@ -6,7 +6,7 @@ import json
 import unittest
 from copy import deepcopy
 
-from jsontemplate import template, optional, cast
+from jsontemplate import template, optional, cast, kwcast
 from jsontemplate.exceptions import *
 
 
@@ -122,6 +122,22 @@ class CastTests(unittest.TestCase):
         data['scores'] = sorted(data['scores'], reverse=True)
         self.assertDictEqual(self.template.output(self.data, full=True), data)
 
+    def test_output_casts_once(self):
+        calls = []
+
+        def target(value):
+            calls.append(value)
+            return int(value)
+
+        templ = template({'id': cast(target, {int, str}), 'ids': [kwcast(dict, {'id': cast(target)})]})
+        output = templ.output({'id': '1', 'ids': [{'id': 2}, {'id': '3'}]})
+        self.assertDictEqual(output, {'id': 1, 'ids': [{'id': 2}, {'id': 3}]})
+        # the branch of {int, str} which outputs '1' depends on the order of the set, only the calls are counted
+        self.assertEqual(len(calls), 3)
+        del calls[:]
+        self.assertIsNone(templ.validate({'id': '1', 'ids': [{'id': 2}]}))
+        self.assertEqual(len(calls), 2)
+
     def test_output(self):
         data = deepcopy(self.data)
         data['age'] = int(data['age'])
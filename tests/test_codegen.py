@@ -0,0 +1,116 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+import os
+import shutil
+import tempfile
+import unittest
+from functools import partial
+
+import test_compile
+from jsontemplate import template, optional, mixin, cast
+from jsontemplate.codegen import _cache_path
+from jsontemplate.exceptions import *
+
+
+class CodegenTests(test_compile.CompileTests):
+
+    def setUp(self):
+        test_compile.CompileTests.setUp(self)
+        self.compiled = self.template.compile(codegen=True)
+
+    def test_source(self):
+        self.assertIn('def ', self.compiled.source)
+        self.assertNotIn('.validate(', self.compiled.source)
+
+    def test_deep_nesting(self):
+        value = int
+        for _ in range(40):
+            value = [{'a': optional(value)}]
+        compiled = template(value).compile(codegen=True)
+        data = [{'a': None}]
+        for _ in range(39):
+            data = [{'a': data}]
+        self.assertIsNone(compiled.validate(data))
+        data[0]['a'][0]['a'] = 'x'
+        self.assertRaises(ValidationError, compiled.validate, data)
+
+
+class CodegenCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_fingerprint(self):
+        self.assertEqual(template({'a': [int], 'b': str}, name='a').fingerprint(),
+                         template({'a': [int], 'b': str}, name='b').fingerprint())
+        self.assertNotEqual(template({'a': [int]}).fingerprint(), template({'a': [float]}).fingerprint())
+        self.assertNotEqual(template({'a': [int]}).fingerprint(), template({'a': [int]}, strict=True).fingerprint())
+
+    def test_fingerprint_callables(self):
+        class Length(object):
+
+            def __call__(self, value):
+                return len(value)
+
+        for target in (partial(sorted, reverse=True), Length()):
+            cast_template = template(mixin(cast(target, str), int))
+            self.assertEqual(cast_template.fingerprint(), template(mixin(cast(target, str), int)).fingerprint())
+            self.assertEqual(len(list(cast_template.generate(5, seed=1))), 5)
+            compiled = cast_template.compile(codegen=True, cache_dir=self.cache_dir)
+            self.assertIsNone(compiled.validate('1a'))
+
+    def test_cache(self):
+        first = template(test_compile.CompileTests.dict_template).compile(codegen=True, cache_dir=self.cache_dir)
+        self.assertIsNotNone(first.source)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        second = template(test_compile.CompileTests.dict_template).compile(codegen=True, cache_dir=self.cache_dir)
+        self.assertIsNone(second.source)
+        self.assertIsNone(second.validate({'first_name': 'a', 'last_name': 'b', 'age': 3,
+                                           'animals': [{'name': 'c', 'age': 1, 'specie': 'dog'}],
+                                           'pet': 'd', 'location': ['e', 1], 'values': [],
+                                           'extra': {'a': 1}}))
+        self.assertRaises(ValidationError, second.validate, {'first_name': 'a'})
+
+    def test_cache_shared_nodes(self):
+        # the same structure, with a sub-template object used twice, shares the cached code,
+        # the interned one calls the shared templates through their other occurrences and has its own code
+        value = {'a': {'x': [int], 'y': str}, 'b': {'x': [int], 'y': str}}
+        part = template(value['a'])
+        for built in (template(value), template({'a': part, 'b': part}), template(value, intern=True)):
+            compiled = built.compile(codegen=True, cache_dir=self.cache_dir)
+            self.assertIsNone(compiled.validate({'a': {'x': [1], 'y': 'z'}, 'b': {'x': [], 'y': 'z'}}, strict=True))
+            self.assertRaises(KeysValidationError, compiled.validate, {'a': {'x': [1], 'z': 1}, 'b': {}}, strict=True)
+            self.assertRaises(NativeValidationError, compiled.validate, {'a': {}, 'b': {'x': ['a']}})
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_corrupted_cache(self):
+        compiled = template({'a': int}).compile(codegen=True, cache_dir=self.cache_dir)
+        for filename in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, filename), 'wb') as cached:
+                cached.write(b'garbage')
+        compiled = template({'a': int}).compile(codegen=True, cache_dir=self.cache_dir)
+        self.assertIsNotNone(compiled.source)
+        self.assertRaises(ValidationError, compiled.validate, {'a': 'b'})
+
+    def test_unwritable_cache(self):
+        # the code is kept in memory when it cannot be written, without leaving temporary files behind
+        blocked = os.path.join(self.cache_dir, 'file')
+        with open(blocked, 'w'):
+            pass
+        compiled = template({'a': int}).compile(codegen=True, cache_dir=os.path.join(blocked, 'cache'))
+        self.assertRaises(ValidationError, compiled.validate, {'a': 'b'})
+        os.mkdir(_cache_path(template({'a': int}), self.cache_dir))
+        compiled = template({'a': int}).compile(codegen=True, cache_dir=self.cache_dir)
+        self.assertRaises(ValidationError, compiled.validate, {'a': 'b'})
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+        # the existing cache directory, which another process may have just created, is used as it is
+        compiled = template({'b': int}).compile(codegen=True, cache_dir=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 3)
+
+if __name__ == '__main__':
+    unittest.main()
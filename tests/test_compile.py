@@ -0,0 +1,109 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+import json
+import unittest
+from copy import deepcopy
+
+from jsontemplate import template
+from jsontemplate.exceptions import *
+from helpers import DICT_TEMPLATE, DOCUMENT
+
+
+# python3 compatibility testing
+try:
+    unicode('hello')
+except:
+    unicode = str
+
+
+class CompileTests(unittest.TestCase):
+
+    dict_template = DICT_TEMPLATE
+    json = DOCUMENT
+
+    def setUp(self):
+        self.data = json.loads(self.json)
+        self.template = template(self.dict_template)
+        self.compiled = self.template.compile()
+
+    def assertSameBehavior(self, data):
+        for strict_ in (False, True):
+            error = self.template.check(deepcopy(data), strict_)
+            if error is not None:
+                self.assertRaises(type(error), self.compiled.validate, deepcopy(data), strict_)
+                self.assertIsInstance(self.compiled.check(deepcopy(data), strict_), type(error))
+                self.assertEqual(str(self.compiled.check(deepcopy(data), strict_)), str(error))
+            else:
+                self.assertIsNone(self.compiled.validate(deepcopy(data), strict_))
+                self.assertTrue(self.compiled.is_valid(deepcopy(data), strict_))
+            for full in (False, True):
+                try:
+                    expected = self.template.output(deepcopy(data), full, strict_)
+                except ValidationError as error:
+                    self.assertRaises(type(error), self.compiled.output, deepcopy(data), full, strict_)
+                else:
+                    self.assertEqual(self.compiled.output(deepcopy(data), full, strict_), expected)
+
+    def test_valid_data(self):
+        self.assertSameBehavior(self.data)
+
+    def test_missing_optional(self):
+        del self.data['scores']
+        self.data['nickname'] = None
+        self.assertSameBehavior(self.data)
+
+    def test_mixin_branches(self):
+        self.data['pet'] = {'name': 'medor', 'age': '3'}
+        self.assertSameBehavior(self.data)
+        self.data['pet'] = 'medor'
+        self.assertSameBehavior(self.data)
+        self.data['pet'] = 12.5
+        self.assertSameBehavior(self.data)
+
+    def test_list_branches(self):
+        self.data['values'] = [1.5, 2, 3]
+        self.assertSameBehavior(self.data)
+        self.data['values'] = [1, 'a']
+        self.assertSameBehavior(self.data)
+        self.data['values'] = [1, 2.5, 3] * 10 + [None]
+        self.assertSameBehavior(self.data)
+        self.assertEqual(self.compiled.check(self.data).index, 30)
+
+    def test_invalid_values(self):
+        for key, value in (('age', 'adrien'), ('first_name', [1]), ('location', ['Paris']),
+                           ('animals', []), ('extra', {'a': 1, 'b': 2}), ('last_name', None)):
+            data = deepcopy(self.data)
+            data[key] = value
+            self.assertSameBehavior(data)
+
+    def test_enum(self):
+        self.data['animals'][0]['specie'] = 'Dog'
+        self.assertSameBehavior(self.data)
+        self.data['animals'][0]['specie'] = 'bat'
+        self.assertSameBehavior(self.data)
+
+    def test_many(self):
+        invalid = deepcopy(self.data)
+        invalid['values'] = [1, 'a']
+        configs = [self.data, invalid]
+        for strict_ in (False, True):
+            self.assertListEqual([type(e) for e in self.compiled.validate_many(configs, strict_)],
+                                 [type(e) for e in self.template.validate_many(configs, strict_)])
+            outputs, errors = self.compiled.output_many(configs, True, strict_)
+            self.assertListEqual(outputs, self.template.output_many(configs, True, strict_)[0])
+            self.assertIsNotNone(errors[1])
+
+    def test_strict_native(self):
+        compiled = template(float).compile()
+        self.assertIsNone(compiled.validate(1, False))
+        self.assertRaises(NativeValidationError, compiled.validate, 1, True)
+        self.assertRaises(NativeValidationError, compiled.validate, float('nan'), True)
+        self.assertEqual(compiled.output('1.5'), 1.5)
+
+    def test_example(self):
+        self.assertEqual(self.compiled.example(full=True), self.template.example(full=True))
+
+if __name__ == '__main__':
+    unittest.main()
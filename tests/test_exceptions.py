@@ -0,0 +1,58 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+import pickle
+import unittest
+
+from jsontemplate import template, enum, mixin
+from jsontemplate.exceptions import *
+
+
+class ExceptionsTests(unittest.TestCase):
+
+    def test_native_message(self):
+        error = NativeValidationError(int, 'abc', 'config[age]')
+        self.assertEqual(str(error), "config[age] should be a <int>, but is instead equal to {!r} of type <{}>".format(
+            'abc', type('abc').__name__))
+
+    def test_truncated_message(self):
+        values = list(range(10 ** 6))
+        with self.assertRaises(ValidationError) as context:
+            template({'a': {'b': int}}).validate({'a': values})
+        self.assertLess(len(str(context.exception)), 200)
+        self.assertIs(context.exception.actual_value, values)
+
+    def test_truncated_repr(self):
+        with self.assertRaises(ListValidationError) as context:
+            template([int]).validate(['a'] + list(range(10 ** 6)))
+        self.assertLess(len(repr(context.exception)), 1000)
+        self.assertTrue(repr(context.exception).startswith('ListValidationError('))
+        self.assertLess(len('%r' % NativeValidationError(int, 'x' * 10 ** 6, 'config')), 200)
+
+    def test_list_message(self):
+        with self.assertRaises(ListValidationError) as context:
+            template([int]).validate([1, 'a', None] * 10 ** 5)
+        self.assertIn('<NoneType>, <int>, <{}>'.format(type('a').__name__), str(context.exception))
+
+    def test_enum_message(self):
+        with self.assertRaises(EnumValidationError) as context:
+            template(enum('cat', 'dog')).validate('bat')
+        self.assertEqual(str(context.exception), "config can only have the following values: cat, dog. "
+                                                 "Instead, it is equal to {!r}".format('bat'))
+
+    def test_mixin_message(self):
+        with self.assertRaises(MixinValidationError) as context:
+            template(mixin({'a': int}, int)).validate([1])
+        self.assertIn('[1] of type <list>', str(context.exception))
+
+    def test_keys_message(self):
+        error = KeysValidationError(set(map(str, range(100))), 'config')
+        self.assertTrue(str(error).endswith(', ...'))
+
+    def test_pickle(self):
+        error = pickle.loads(pickle.dumps(SizeValidationError(1, 5, 7, 'config')))
+        self.assertEqual(str(error), 'config should have between 1 and 5 elements but has 7')
+
+if __name__ == '__main__':
+    unittest.main()
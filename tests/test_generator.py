@@ -0,0 +1,105 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+import json
+import os
+import subprocess
+import sys
+import unittest
+import uuid
+from datetime import date, datetime, timedelta
+
+from jsontemplate import template, optional, default, mixin, size, strict, cast, kwcast, enum
+from jsontemplate.exceptions import *
+
+
+def reject(value):
+    raise ValueError(value)
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d')
+
+
+class Point(object):
+
+    def __init__(self, x, y=0.0):
+        self.x, self.y = x, y
+
+
+class GeneratorTests(unittest.TestCase):
+
+    value = {
+        'id': int,
+        'name': str,
+        'scores': [{float, int}],
+        'pair': [int, str],
+        'kind': enum('cat', 'dog', 'pokemon'),
+        'tags': size([str], 2, 4),
+        'nickname': optional(str),
+        'age': default(int, 3),
+        'location': (str, int),
+        'animal': mixin({'name': str}, (str, int)),
+        'flags': strict({'active': bool}),
+        'positive': cast(float, float),
+        'point': kwcast(Point, {'x': float, 'y': optional(float)}),
+        'extra': any,
+    }
+
+    def setUp(self):
+        self.template = template(self.value)
+
+    def test_valid(self):
+        for document in self.template.generate(500, seed=1):
+            self.template.validate(document, strict=True)
+            self.assertTrue(2 <= len(document['tags']) <= 4)
+            self.assertIn(document['kind'], ('cat', 'dog', 'pokemon'))
+            self.assertEqual(len(set(type(v) for v in document['pair'])), min(len(document['pair']), 1))
+
+    def test_varied(self):
+        documents = list(self.template.generate(200, seed=2))
+        self.assertEqual(len(set(d['kind'] for d in documents)), 3)
+        self.assertEqual(len(set(len(d['tags']) for d in documents)), 3)
+        self.assertEqual(len(set(type(d['animal']) for d in documents)), 2)
+        self.assertTrue(0 < sum('nickname' in d for d in documents) < 200)
+
+    def test_full_ratio(self):
+        self.assertTrue(all('nickname' in d for d in self.template.generate(50, full_ratio=1)))
+        self.assertFalse(any('age' in d for d in self.template.generate(50, full_ratio=0)))
+        self.assertRaises(TemplateValueError, self.template.generate, 1, full_ratio=2)
+
+    def test_seed(self):
+        documents = list(self.template.generate(20, seed=3))
+        self.assertEqual(len(documents), 20)
+        self.assertListEqual(list(self.template.compile().generate(20, seed=3)), documents)
+        self.assertNotEqual(list(self.template.generate(20, seed=4)), documents)
+
+    def test_seed_across_processes(self):
+        code = ('import json; from jsontemplate import template; '
+                'print(json.dumps(list(template([{float, int, bool, str}]).generate(10, seed=5))))')
+        outputs = set()
+        for hash_seed in ('1', '2'):
+            env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+            outputs.add(subprocess.check_output([sys.executable, '-c', code], env=env))
+        self.assertEqual(len(outputs), 1)
+        self.assertEqual(len(json.loads(outputs.pop().decode('utf-8'))), 10)
+
+    def test_cast_attempts(self):
+        self.assertRaises(TemplateValueError, list, template({'a': cast(reject, str)}).generate(1))
+
+    def test_cast_generators(self):
+        casts = template({'id': cast(uuid.UUID, str), 'birth': cast(parse_date, str)})
+        self.assertRaises(TemplateValueError, list, casts.generate(1, seed=6))
+        generators = {parse_date: lambda rand: (date(1950, 1, 1) + timedelta(days=rand.randrange(25000))).isoformat()}
+        documents = list(casts.generate(50, seed=6, generators=generators))
+        for document in documents:
+            output = casts.output(document)
+            self.assertIsInstance(output['id'], uuid.UUID)
+            self.assertIsInstance(output['birth'], datetime)
+        self.assertEqual(len(set(d['id'] for d in documents)), 50)
+        self.assertListEqual(list(casts.compile().generate(50, seed=6, generators=generators)), documents)
+        self.assertRaises(TemplateValueError, list, casts.generate(1, generators={parse_date: lambda rand: 'a'}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -130,5 +130,16 @@ class KWCastTests(unittest.TestCase):
         data['animal'] = Animal(**self.data['animal'])
         self.assertDictEqual(self.template.output(self.data), data)
 
+    def test_output_list_full(self):
+        # the full output passes the example of y to the target, which rejects it while check accepts the element
+        class Point(object):
+            def __init__(self, x):
+                self.x = x
+
+        points = template([kwcast(Point, {'x': int, 'y': optional(int)})])
+        for compiled in (points, points.compile()):
+            self.assertEqual(compiled.output([{'x': 1}])[0].x, 1)
+            self.assertRaises(ValidationError, compiled.output, [{'x': 1}], full=True)
+
 if __name__ == '__main__':
     unittest.main()
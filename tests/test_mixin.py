@@ -6,6 +6,8 @@ import json
 import unittest
 
 from jsontemplate import template, optional, mixin
+from jsontemplate.exceptions import ValidationError
+from helpers import Counted
 
 
 # python3 compatibility testing
@@ -69,6 +71,21 @@ class MixinTests(unittest.TestCase):
         del self.data['animal']['specie']
         self.assertIsNone(self.template.validate(self.data))
 
+    def test_type_dispatch(self):
+        checked = []
+        templ = template(mixin(Counted(str, 'name', checked), {'name': str}, (str, str, int)))
+        self.assertIsNone(templ.validate({'name': 'kupa'}))
+        self.assertDictEqual(templ.output({'name': 'kupa'}), {'name': 'kupa'})
+        self.assertIsNone(templ.validate(['kupa', 'cat', 8]))
+        self.assertListEqual(checked, [])
+        self.assertIsNone(templ.validate('kupa'))
+        self.assertListEqual(checked, ['kupa'])
+
+    def test_dispatch_order(self):
+        self.assertIsInstance(template(mixin(float, int)).output(1), float)
+        self.assertIsInstance(template(mixin(float, int)).output(1, strict=True), int)
+        self.assertRaises(ValidationError, template(mixin({'a': int}, [int])).validate, 'a')
+
     def test_example(self):
         self.assertDictEqual(self.template.example(), {
             'first_name': 'example',
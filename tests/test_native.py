@@ -3,10 +3,14 @@
 
 from __future__ import unicode_literals
 import json
+import os
+import pickle
+import tempfile
 import unittest
 
-from jsontemplate import template
+from jsontemplate import template, strict, optional, size, enum, cast, kwcast
 from jsontemplate.exceptions import *
+from helpers import Counted
 
 
 # python3 compatibility testing
@@ -84,6 +88,145 @@ class NativeTests(unittest.TestCase):
         self.data['first_name'] = ['Adrien', 'El Zein']
         self.assertRaises(ValidationError, self.template.validate, self.data)
 
+    def test_check_valid_data(self):
+        self.assertIsNone(self.template.check(self.data))
+        self.assertTrue(self.template.is_valid(self.data))
+
+    def test_check_invalid_data(self):
+        self.data['scores'][4] = '2az'
+        self.assertIsInstance(self.template.check(self.data), ListValidationError)
+        self.assertFalse(self.template.is_valid(self.data))
+        self.data['location'] = ['Paris']
+        self.assertIsInstance(self.template.check(self.data), SizeValidationError)
+
+    def test_validate_max_errors(self):
+        self.assertListEqual(self.template.validate(self.data, max_errors=10), [])
+        self.data['age'] = 'old'
+        self.data['animals'][1]['age'] = None
+        self.data['animals'][1]['specie'] = [1]
+        self.data['location'][1] = 'Paris'
+        self.data['scores'].append('a')
+        errors = self.template.validate(self.data, max_errors=10)
+        self.assertListEqual(sorted(error.path for error in errors),
+                             sorted([('age',), ('animals', 1, 'age'), ('animals', 1, 'specie'),
+                                     ('location', 1), ('scores', 7)]))
+        self.assertIsInstance(errors[0], NativeValidationError)
+        self.assertEqual(len(self.template.validate(self.data, max_errors=2)), 2)
+        self.assertEqual(len(self.template.compile().validate(self.data, max_errors=1)), 1)
+        self.data['unknown'] = 1
+        self.assertIsInstance(self.template.validate(self.data, True, max_errors=1)[0], KeysValidationError)
+        self.assertRaises(TemplateValueError, self.template.validate, self.data, max_errors=0)
+
+    def test_names(self):
+        animal = template({'name': str, 'age': int})
+        self.assertEqual(animal.value['age'].name, 'config[age]')
+        owner = template({'pets': [animal], 'name': str}, name='owner')
+        self.assertEqual(animal.value['age'].name, 'owner[pets][0][age]')
+        owner.name = 'person'
+        with self.assertRaises(NativeValidationError) as context:
+            animal.validate({'name': 'kupa', 'age': 'old'})
+        self.assertEqual(context.exception.name, 'person[pets][0][age]')
+
+    def test_nested_strict(self):
+        # nested templates take the strictness of their parent, unless they are wrapped in the strict keyword
+        lenient, strict_ = template({'a': int}, strict=True), template(strict({'a': int}))
+        outer = template({'lenient': lenient, 'strict': strict_})
+        self.assertFalse(lenient.value['a'].strict)
+        self.assertTrue(strict_.value.value['a'].strict)
+        self.assertIsNone(outer.check({'lenient': {'a': 1.0}, 'strict': {'a': 1}}))
+        self.assertIsNotNone(outer.check({'lenient': {'a': 1}, 'strict': {'a': 1.0}}))
+        template(outer, strict=True)
+        self.assertTrue(lenient.value['a'].strict)
+        template(outer)
+        self.assertFalse(lenient.value['a'].strict)
+        self.assertTrue(strict_.value.value['a'].strict)
+
+    def test_intern(self):
+        address = {'street': str, 'geo': [{float, int}]}
+        value = {'billing': address, 'shipping': address, 'scores': [{float, int}], 'strict': strict([{float, int}])}
+        interned = template(value, intern=True)
+        billing, shipping = interned.value['billing'], interned.value['shipping']
+        self.assertIsNot(billing, shipping)
+        self.assertIs(shipping.value['geo'].value, billing.value['geo'])
+        self.assertIs(interned.value['scores'].value[0].value, billing.value['geo'].value[0])
+        self.assertIsNot(interned.value['strict'].value.value[0], billing.value['geo'].value[0])
+        self.assertEqual(shipping.value['geo'].name, 'config[shipping][geo]')
+
+        data = {'billing': {'street': 1, 'geo': [1]}, 'shipping': {'street': 'b', 'geo': [1.5, 'x']},
+                'scores': [], 'strict': [1.5]}
+        self.assertIsNone(interned.check(dict(data, shipping=data['billing'])))
+        self.assertIsNotNone(interned.check(dict(data, shipping=data['billing']), strict=True))
+        # the errors raised through the other occurrences of a shared template are named after them
+        data['billing']['street'] = 'a'
+        for checked in (interned, interned.compile(), interned.compile(codegen=True)):
+            with self.assertRaises(ListValidationError) as context:
+                checked.validate(data)
+            self.assertEqual(context.exception.name, 'config[shipping][geo]')
+            self.assertEqual(pickle.loads(pickle.dumps(context.exception)).name, 'config[shipping][geo]')
+        with self.assertRaises(ListValidationError) as context:
+            interned.output(data)
+        self.assertEqual(context.exception.name, 'config[shipping][geo]')
+        self.assertEqual(interned.check(dict(data, shipping={'street': [1], 'geo': []})).name,
+                         'config[shipping][street]')
+        errors = interned.validate(data, max_errors=5)
+        self.assertListEqual([(e.path, e.name) for e in errors], [(('shipping', 'geo', 1), 'config[shipping][geo][0]')])
+        with self.assertRaises(NativeValidationError) as context:
+            interned.validate_patch(data, [{'op': 'replace', 'path': '/shipping/street', 'value': [1]}])
+        self.assertEqual(context.exception.name, 'config[shipping][street]')
+
+    def test_slots(self):
+        value = dict(self.dict_template, nickname=optional(str), size=size([int], 0, 5), kind=enum('a', 'b'),
+                     date=cast(unicode, str), any=any)
+        nodes = [template(value)]
+        for node in nodes:
+            self.assertFalse(hasattr(node, '__dict__'), type(node))
+            nodes.extend(node._children())
+        self.assertGreater(len(nodes), 20)
+        copy = pickle.loads(pickle.dumps(nodes[0], pickle.HIGHEST_PROTOCOL))
+        data = dict(self.data, size=[1, 2], kind='b', date='today', any=None)
+        self.assertEqual(copy.output(data, full=True), nodes[0].output(data, full=True))
+        self.assertEqual(copy.value['scores'].value[0].name, 'config[scores][0]')
+
+    def test_loads_binary(self):
+        data = (self.json.replace('Zein', 'Zéin')).encode('utf-8')
+        expected = self.template.loads(data.decode('utf-8'))
+        self.assertEqual(expected['last_name'], 'El Zéin')
+        for value in (data, bytearray(data), memoryview(data), b'\xef\xbb\xbf' + data):
+            self.assertDictEqual(self.template.loads(value), expected)
+            self.assertDictEqual(self.template.compile().loads(value), expected)
+        for encoding in ('utf-16', 'utf-16-le', 'utf-16-be', 'utf-32', 'utf-32-le', 'utf-32-be'):
+            encoded = data.decode('utf-8').encode(encoding)
+            self.assertDictEqual(self.template.loads(encoded), expected)
+            self.assertDictEqual(self.template.loads(memoryview(encoded)), expected)
+            self.assertDictEqual(self.template.decode(encoded), expected)
+
+    def test_load_memory_map(self):
+        descriptor, path = tempfile.mkstemp()
+        try:
+            with os.fdopen(descriptor, 'wb') as data:
+                data.write(self.json.encode('utf-8'))
+            self.assertDictEqual(self.template.load(path, memory_map=True), self.template.load(path))
+            with open(path, 'wb'):
+                pass
+            self.assertRaises(ValueError, self.template.load, path, memory_map=True)
+        finally:
+            os.remove(path)
+
+    def test_validate_many(self):
+        invalid = dict(self.data, location=['Paris'])
+        errors = self.template.validate_many(iter([self.data, invalid, self.data]), strict=True)
+        self.assertEqual(len(errors), 3)
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], SizeValidationError)
+        self.assertIsNone(errors[2])
+
+    def test_output_many(self):
+        outputs, errors = self.template.output_many([self.data, 12], full=True)
+        self.assertDictEqual(outputs[0], self.template.output(self.data, full=True))
+        self.assertIsNone(errors[0])
+        self.assertIsNone(outputs[1])
+        self.assertIsInstance(errors[1], NativeValidationError)
+
     def test_example(self):
         self.assertDictEqual(self.template.example(), {
             'first_name': 'example',
@@ -116,9 +259,64 @@ class NativeTests(unittest.TestCase):
             'scores': [0.0]
             })
 
+    def test_example_cache(self):
+        example = self.template.example(full=True)
+        example['animals'][0]['name'] = 'kupa'
+        self.assertEqual(self.template.example(full=True)['animals'][0]['name'], 'example')
+        self.assertIsNot(self.template.example(), self.template.example())
+
+        class Point(object):
+            def __init__(self, x=0.0, y=0.0):
+                self.x, self.y = x, y
+
+        points = template({'point': kwcast(Point, {'x': float})})
+        self.assertIsNot(points.example()['point'], points.example()['point'])
+        self.assertEqual(points.example()['point'].x, 0.0)
+
+        # the immutable examples are not copied
+        scalars = template({'name': str, 'age': int, 'weight': float, 'alive': bool, 'nickname': optional(str)})
+        self.assertIs(scalars.value['name'].example(), scalars.value['name'].example())
+        self.assertIsNone(scalars.value['nickname'].example())
+        self.assertIsNot(scalars.example(), scalars.example())
+
+        sized = template({'scores': size([int], 1, 50)})
+        self.assertGreater(len(set(len(sized.example()['scores']) for _ in range(20))), 1)
+        self.assertEqual(len(sized.example(full=True)['scores']), 50)
+
+        names = template(enum('a', 'b'))
+        before = names.example()
+        names.value = {'c'}
+        self.assertEqual(names.example(), before)
+        template(names, 'names')
+        self.assertEqual(names.example(), 'c')
+
     def test_output(self):
         self.assertDictEqual(self.template.output(self.data), self.data)
 
+    def test_output_single_pass(self):
+        calls = []
+        data = [[{'value': 1}, {'value': 2}], [{'value': 3}]]
+        self.assertListEqual(template([[{'value': Counted(int, 'value', calls)}]]).output(data), data)
+        # each value is output without being checked first
+        self.assertListEqual(calls, [1, 2, 3])
+
+    def test_list_branch_selection(self):
+        calls = []
+        list_template = template([Counted(float, 'value', calls), Counted(int, 'value', calls)])
+        data = list(range(1000)) + ['a']
+        error = list_template.check(data)
+        self.assertIsInstance(error, ListValidationError)
+        self.assertEqual(error.index, 1000)
+        self.assertIn('config[1000] equal to {!r}'.format('a'), str(error))
+        self.assertEqual(len(calls), 1002)
+
+        self.assertIsNone(list_template.check([1.5, 2, 3]))
+        self.assertEqual(list_template.check([1, 2, 1.5], strict=True).index, 2)
+        self.assertListEqual(list_template.output([1, 2, 3], strict=True), [1, 2, 3])
+        with self.assertRaises(ListValidationError) as context:
+            list_template.output([1, 2, 'a'])
+        self.assertEqual(context.exception.index, 2)
+
 if __name__ == '__main__':
     unittest.main()
 
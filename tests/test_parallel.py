@@ -0,0 +1,61 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+import json
+import pickle
+import unittest
+from copy import deepcopy
+
+from jsontemplate import template, cast, mixin, parallel
+from jsontemplate.exceptions import *
+from helpers import DICT_TEMPLATE, DOCUMENT
+
+
+class ParallelTests(unittest.TestCase):
+
+    def setUp(self):
+        self.template, self.data = template(DICT_TEMPLATE), json.loads(DOCUMENT)
+        invalid = deepcopy(self.data)
+        invalid['values'] = [1, 'a']
+        self.configs = [self.data, invalid, 12] * 5
+
+    def test_pickle(self):
+        self.template.check(self.data)
+        copy = pickle.loads(pickle.dumps(self.template))
+        self.assertEqual(copy.fingerprint(), self.template.fingerprint())
+        self.assertEqual(copy.output(self.data, full=True), self.template.output(self.data, full=True))
+        self.assertEqual(str(copy.check(self.configs[1])), str(self.template.check(self.configs[1])))
+
+    def test_validate_parallel(self):
+        for strict_ in (False, True):
+            errors = self.template.validate_parallel(self.configs, strict_, workers=2, chunksize=4)
+            self.assertListEqual([type(e) for e in errors],
+                                 [type(e) for e in self.template.validate_many(self.configs, strict_)])
+
+    def test_output_parallel(self):
+        outputs, errors = self.template.output_parallel(iter(self.configs), full=True, workers=2, chunksize=4)
+        expected = self.template.output_many(self.configs, full=True)
+        self.assertListEqual(outputs, expected[0])
+        self.assertListEqual([type(e) for e in errors], [type(e) for e in expected[1]])
+
+    def test_light_errors(self):
+        wide = template({'key{}'.format(i): {'a': int, 'b': [int, float]} for i in range(200)})
+        document = {'key{}'.format(i): {'a': 1, 'b': [1, 'x'] if i == 1 else []} for i in range(200)}
+        lists = template({'values': [{'a': int}, {'b': str}]})
+        for error in (wide.check(document), lists.check({'values': [1]}),
+                      template({'a': mixin(int, [str])}).check({'a': 'b'})):
+            light = parallel._light(error)
+            self.assertIs(type(light), type(error))
+            self.assertEqual(str(light), str(error))
+            self.assertLess(len(pickle.dumps(light)), 1000)
+        errors = lists.validate_parallel([{'values': [1]}, {'values': []}], workers=2)
+        self.assertIsInstance(errors[0], ListValidationError)
+        self.assertEqual(str(errors[0]), str(lists.check({'values': [1]})))
+        self.assertIsNone(errors[1])
+
+    def test_unpicklable(self):
+        self.assertRaises(TemplateTypeError, template({'a': cast(lambda v: v)}).validate_parallel, [{'a': 1}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+import unittest
+import uuid
+from copy import deepcopy
+
+from jsontemplate import template, default, mixin, size, sample, strict, cast
+from jsontemplate.patch import DocumentPatch
+from jsontemplate.exceptions import *
+from helpers import Counted
+
+
+class PatchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.template = template({
+            'animals': [{'name': str, 'age': int, 'tags': default([str], ['pet'])}],
+            'sizes': size([int], 1, 3),
+            'pair': (int, str),
+            'owner': mixin({'age': int}, [int]),
+            'flags': strict({'active': bool}),
+            'numbers': [int, float],
+            'id': cast(uuid.UUID, str),
+        })
+        self.document = {
+            'animals': [{'name': 'Rex', 'age': 3}, {'name': 'Tom', 'age': 5, 'tags': ['cat']}],
+            'sizes': [1],
+            'pair': [1, 'a'],
+            'owner': {'age': 30},
+            'flags': {'active': True},
+            'numbers': [1, 2],
+            'id': str(uuid.UUID(int=1)),
+        }
+        self.template.validate(self.document)
+
+    def patch(self, *operations):
+        return self.template.validate_patch(self.document, list(operations))
+
+    def test_copy_on_write(self):
+        original = deepcopy(self.document)
+        patched = self.patch({'op': 'replace', 'path': '/animals/1/name', 'value': 'Garfield'},
+                             {'op': 'add', 'path': '/flags/active', 'value': False})
+        self.assertDictEqual(self.document, original)
+        self.assertEqual(patched['animals'][1]['name'], 'Garfield')
+        self.assertFalse(patched['flags']['active'])
+        self.assertIs(patched['animals'][0], self.document['animals'][0])
+        self.assertIs(patched['owner'], self.document['owner'])
+
+    def test_touched_only(self):
+        calls = []
+        counted = template({'values': [{'n': Counted(int, 'n', calls)}]})
+        document = {'values': [{'n': i} for i in range(1000)]}
+        patched = counted.validate_patch(document, [{'op': 'replace', 'path': '/values/10/n', 'value': -1},
+                                                    {'op': 'add', 'path': '/values/0', 'value': {'n': -2}}])
+        self.assertEqual(sorted(calls), [-2, -1])
+        self.assertEqual(patched['values'][11], {'n': -1})
+        self.assertRaises(NativeValidationError, counted.validate_patch, document,
+                          [{'op': 'replace', 'path': '/values/3/n', 'value': 'a'}])
+
+    def test_invalid_values(self):
+        self.assertRaises(NativeValidationError, self.patch, {'op': 'replace', 'path': '/animals/0/age', 'value': 'a'})
+        self.assertRaises(NativeValidationError, self.patch, {'op': 'remove', 'path': '/animals/0/name'})
+        self.assertRaises(NativeValidationError, self.patch, {'op': 'add', 'path': '/owner/age', 'value': 'a'})
+        self.assertRaises(MixinValidationError, self.patch, {'op': 'replace', 'path': '/owner', 'value': 'a'})
+        self.assertRaises(ListValidationError, self.patch, {'op': 'add', 'path': '/numbers/-', 'value': 'a'})
+        self.assertRaises(CastValidationError, self.patch, {'op': 'replace', 'path': '/id', 'value': 'a'})
+        # a removed optional value, and an element inserted then moved by the following insertions
+        self.patch({'op': 'remove', 'path': '/animals/1/tags'})
+        self.assertRaises(NativeValidationError, self.patch,
+                          {'op': 'add', 'path': '/animals/0', 'value': {'name': 'a', 'age': 'a'}},
+                          {'op': 'add', 'path': '/animals/0', 'value': {'name': 'b', 'age': 1}})
+
+    def test_containers(self):
+        self.patch({'op': 'add', 'path': '/sizes/-', 'value': 2}, {'op': 'add', 'path': '/sizes/0', 'value': 3})
+        self.assertRaises(SizeValidationError, self.patch, {'op': 'remove', 'path': '/sizes/0'})
+        self.assertRaises(SizeValidationError, self.patch, *[{'op': 'add', 'path': '/sizes/-', 'value': 2}] * 3)
+        self.assertRaises(SizeValidationError, self.patch, {'op': 'add', 'path': '/pair/-', 'value': 1})
+        self.assertRaises(KeysValidationError, self.patch, {'op': 'add', 'path': '/flags/other', 'value': 1})
+        self.patch({'op': 'add', 'path': '/animals/0/other', 'value': 1})
+        self.assertRaises(KeysValidationError, self.template.validate_patch, self.document,
+                          [{'op': 'add', 'path': '/animals/0/other', 'value': 1}], strict=True)
+
+    def test_sample(self):
+        sampled = template({'points': sample([{'x': int}], min_count=10)})
+        document = {'points': [{'x': i} for i in range(10000)]}
+        self.assertRaises(NativeValidationError, sampled.validate_patch, document,
+                          [{'op': 'replace', 'path': '/points/5000/x', 'value': 'a'}])
+
+    def test_patch_errors(self):
+        for operation in ({'op': 'remove', 'path': '/missing'}, {'op': 'replace', 'path': '/sizes/1', 'value': 1},
+                          {'op': 'add', 'path': '/sizes/01', 'value': 1}, {'op': 'add', 'path': '/pair/0/a', 'value': 1},
+                          {'op': 'test', 'path': '/sizes/0', 'value': 2}, {'op': 'move', 'from': '/a', 'path': '/a/b'},
+                          {'op': 'add', 'path': 'sizes', 'value': 1}, {'op': 'add', 'path': '/sizes/-'},
+                          {'op': 'rename', 'path': '/sizes'}):
+            self.assertRaises(PatchValidationError, self.patch, operation)
+
+    def test_operations(self):
+        patched = self.patch({'op': 'test', 'path': '/pair/1', 'value': 'a'},
+                             {'op': 'copy', 'from': '/animals/0', 'path': '/animals/-'},
+                             {'op': 'move', 'from': '/animals/0', 'path': '/animals/1'},
+                             {'op': 'replace', 'path': '', 'value': patched_root()})
+        self.assertEqual(patched, patched_root())
+        patched = DocumentPatch({'a/b': {'~': [1, 2]}}).apply([
+            {'op': 'move', 'from': '/a~1b/~0/0', 'path': '/a~1b/~0/-'},
+            {'op': 'copy', 'from': '/a~1b', 'path': '/c'},
+        ])
+        self.assertEqual(patched.document, {'a/b': {'~': [2, 1]}, 'c': {'~': [2, 1]}})
+        self.assertIsNot(patched.document['c'], patched.document['a/b'])
+
+    def test_output_patch(self):
+        output = self.template.output(self.document)
+        patched = self.template.output_patch(output, [
+            {'op': 'add', 'path': '/animals/-', 'value': {'name': 'Nemo', 'age': 1}},
+            {'op': 'replace', 'path': '/id', 'value': str(uuid.UUID(int=2))},
+            {'op': 'remove', 'path': '/animals/1/tags'},
+        ])
+        self.assertEqual(patched['animals'][2], {'name': 'Nemo', 'age': 1, 'tags': ['pet']})
+        self.assertEqual(patched['animals'][1]['tags'], ['pet'])
+        self.assertEqual(patched['id'], uuid.UUID(int=2))
+        self.assertEqual(output['id'], uuid.UUID(int=1))
+        self.assertEqual(len(output['animals']), 2)
+        self.assertEqual(self.template.compile().output_patch(output, []), output)
+        casted = template({'point': cast(dict, {'x': int})})
+        self.assertRaises(TemplateValueError, casted.output_patch, {'point': {'x': 1}},
+                          [{'op': 'replace', 'path': '/point/x', 'value': 2}])
+
+
+def patched_root():
+    return {'animals': [], 'sizes': [1], 'pair': [1, 'a'], 'owner': [1], 'flags': {'active': False},
+            'numbers': [], 'id': str(uuid.UUID(int=3))}
+
+if __name__ == '__main__':
+    unittest.main()
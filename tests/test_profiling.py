@@ -0,0 +1,69 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+import unittest
+
+from jsontemplate import template, optional, cast, mixin
+from jsontemplate.native import Dict, List, Native
+from jsontemplate.exceptions import *
+
+
+class ProfilingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.template = template({
+            'id': int,
+            'scores': [int, float],
+            'weight': cast(float, int),
+            'nickname': optional(str),
+            'owner': mixin({'name': str}, (str, int)),
+        })
+        self.data = {'id': 1, 'scores': [1, 2, 1.5], 'weight': 3, 'owner': {'name': 'sacha'}}
+
+    def test_stats(self):
+        with self.template.profile() as profile:
+            self.template.validate(self.data)
+            self.assertRaises(ValidationError, self.template.output, dict(self.data, id='a'))
+        stats = profile.stats
+        self.assertEqual(stats['config', 'Dict', ()]['calls'], 2)
+        self.assertEqual(stats['config', 'Dict', ()]['failures'], 1)
+        self.assertEqual(stats['config[id]', 'Native', ()]['calls'], 2)
+        self.assertEqual(stats['config[id]', 'Native', ()]['failures'], 1)
+        # the int branch of the list rejects 1.5, the float branch is tried on 1.5 and then on the 3 scores
+        self.assertEqual(stats['config[scores][0]', 'Native', ()]['failures'], 1)
+        self.assertEqual(stats['config[scores][1]', 'Native', ()]['calls'], 4)
+        self.assertEqual(stats['config[weight]', 'cast', ()]['casts'], 1)
+        self.assertNotIn(('config[owner]', 'Tuple', (1,)), stats)
+        self.assertGreater(stats['config', 'Dict', ()]['time'], stats['config[id]', 'Native', ()]['time'])
+        self.assertIn('config[scores] <List>', profile.report())
+        self.assertEqual(len(profile.report(limit=2).splitlines()), 3)
+
+    def test_mixin_branches(self):
+        # the branches of a mixin have its name, they are told apart by their index
+        owners = template({'owner': mixin(int, str, {'id': int}, {'id': str})})
+        with owners.profile() as profile:
+            for owner in (1, 'a', {'id': 'b'}):
+                owners.validate({'owner': owner})
+        stats = profile.stats
+        self.assertEqual(stats['config[owner]', 'mixin', ()]['calls'], 3)
+        self.assertEqual(stats['config[owner]', 'Native', (0,)]['failures'], 1)
+        self.assertEqual(stats['config[owner]', 'Native', (1,)]['failures'], 0)
+        self.assertEqual(stats['config[owner][id]', 'Native', (2,)]['failures'], 1)
+        self.assertEqual(stats['config[owner][id]', 'Native', (3,)]['failures'], 0)
+        self.assertIn('config[owner] <Native> branch 1', profile.report())
+
+    def test_restored(self):
+        fingerprint = self.template.fingerprint()
+        with self.template.profile() as profile:
+            self.assertEqual(self.template.fingerprint(), fingerprint)
+            self.assertIsInstance(self.template, Dict)
+            self.template.check(self.data)
+        self.assertIs(type(self.template), Dict)
+        self.assertIs(type(self.template.value['scores']), List)
+        self.assertIs(type(self.template.value['scores'].value[0]), Native)
+        self.template.check(self.data)
+        self.assertEqual(profile.stats['config', 'Dict', ()]['calls'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+import unittest
+
+from jsontemplate import template, size, sample
+from jsontemplate.exceptions import *
+from helpers import Counted
+
+
+class SampleTests(unittest.TestCase):
+
+    def setUp(self):
+        self.points = [{'x': float(i), 'y': 0.5} for i in range(10000)]
+        self.template = template({'points': sample([{'x': float, 'y': float}], rate=0.01, min_count=10)})
+
+    def test_validate(self):
+        self.assertIsNone(self.template.validate({'points': self.points}))
+        self.assertIsNone(self.template.validate({'points': []}))
+        self.assertIsNone(self.template.validate({'points': self.points[:5]}))
+        self.assertRaises(NativeValidationError, self.template.validate, {'points': {}})
+
+    def test_sampled_elements(self):
+        calls = []
+        sampled = template(sample([Counted(int, 'value', calls)], rate=0.01, min_count=10, seed=1))
+        values = list(range(10000))
+        self.assertIsNone(sampled.check(values))
+        self.assertEqual(len(calls), 102)
+        self.assertEqual((calls[0], calls[-1]), (0, 9999))
+        self.assertEqual(len(set(calls)), 102)
+        checked = list(calls)
+        del calls[:]
+        sampled.check(values)
+        self.assertListEqual(calls, checked)
+
+    def test_first_and_last(self):
+        for index in (0, 9999):
+            points = list(self.points)
+            points[index] = {'x': 'a', 'y': 0.5}
+            error = self.template.check({'points': points})
+            self.assertIsInstance(error, ListValidationError)
+            self.assertEqual(error.index, index)
+            self.assertIn('config[points][{}]'.format(index), str(error))
+        points = list(self.points)
+        points[5000] = None
+        self.assertIsNone(self.template.check({'points': points}))
+
+    def test_size(self):
+        sized = template(sample(size([int], 1, 100), min_count=5))
+        self.assertIsNone(sized.check(list(range(100))))
+        self.assertIsInstance(sized.check(list(range(101))), SizeValidationError)
+        self.assertIsInstance(sized.check([]), SizeValidationError)
+        self.assertRaises(SizeValidationError, sized.output, list(range(200)))
+        self.assertIsInstance(sized.check(['a', 2, 3]), ValidationError)
+
+    def test_output(self):
+        points = [{'x': i, 'y': '0.5'} for i in range(1000)]
+        output = self.template.output({'points': points})['points']
+        self.assertEqual(len(output), 1000)
+        self.assertEqual(output[0], {'x': 0.0, 'y': 0.5})
+        self.assertEqual(sum(1 for o, p in zip(output, points) if o is p), 1000 - 12)
+        self.assertEqual(template(sample([float])).output([1, 2, 3]), [1.0, 2.0, 3.0])
+
+    def test_invalid(self):
+        self.assertRaises(TemplateTypeError, sample, {'a': int})
+        self.assertRaises(TemplateValueError, sample, [int], rate=0)
+        self.assertRaises(TemplateValueError, sample, [int], rate=1.5)
+
+    def test_example(self):
+        self.assertEqual(self.template.example(), {'points': [{'x': 0.0, 'y': 0.0}]})
+        for document in self.template.generate(20, seed=1):
+            self.template.validate(document, strict=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -76,6 +76,11 @@ class SizeTests(unittest.TestCase):
         self.data['scores'] = [0]*10
         self.assertRaises(ValidationError, self.template.validate, self.data)
 
+    def test_validate_max_errors(self):
+        errors = template({'a': size([int], 1, 2)}).validate({'a': [1, 'x', 3, 'y']}, max_errors=5)
+        self.assertListEqual([error.path for error in errors], [('a', 1), ('a', 3), ('a',)])
+        self.assertIsInstance(errors[2], SizeValidationError)
+
     def test_example(self):
         data = self.template.example()
         self.assertLessEqual(len(data['scores']), 5)
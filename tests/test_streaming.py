@@ -0,0 +1,193 @@
+#!/usr/bin/env python2.7
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from jsontemplate import template, size, strict, optional, sample
+from jsontemplate.streaming import iter_array, TemplateDecoder
+from jsontemplate.exceptions import *
+from helpers import DICT_TEMPLATE, DOCUMENT
+
+
+# python3 compatibility testing
+try:
+    unicode('hello')
+except NameError:
+    unicode = str
+
+
+class StreamingTests(unittest.TestCase):
+
+    records = [{'id': i, 'name': 'record {}'.format(i), 'score': i / 3.0, 'tags': ['a', 'é'] * (i % 3)}
+               for i in range(200)]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.template = template([{'id': int, 'name': str, 'score': float, 'tags': [str],
+                                   'comment': optional(str)}])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def dump(self, value):
+        path = os.path.join(self.directory, 'data.json')
+        with io.open(path, 'w', encoding='utf-8') as data:
+            data.write(unicode(json.dumps(value, ensure_ascii=False, indent=1)))
+        return path
+
+    def test_iter_array(self):
+        text = json.dumps(self.records + [12345678, -1.5e10, None, True, '', [], {}], indent=2)
+        for buffer_size in (1, 3, 64, 1 << 16):
+            self.assertListEqual(list(iter_array(io.StringIO(unicode(text)), buffer_size)), json.loads(text))
+        self.assertListEqual(list(iter_array(io.StringIO(' [ ] '))), [])
+
+    def test_iter_array_numbers(self):
+        # the chunks end in the middle of the numbers, after their dot, exponent or sign
+        for text in ('[1e5]', '[1.5,2.25e-3,-4]', '[-1.0E+10, 3.75]', json.dumps([i / 7.0 for i in range(300)])):
+            for buffer_size in (1, 2, 3, 5, 7):
+                self.assertListEqual(list(iter_array(io.StringIO(unicode(text)), buffer_size)), json.loads(text))
+
+    def test_iter_array_invalid(self):
+        for text in ('{"a": 1}', '[1, 2', '[1 2]', '[1, 2] 3', '[1, nope]'):
+            with self.assertRaises(ValueError):
+                list(iter_array(io.StringIO(unicode(text)), 2))
+
+    def test_iter_load(self):
+        path = self.dump(self.records)
+        outputs = self.template.iter_load(path, full=True)
+        self.assertNotIsInstance(outputs, list)
+        self.assertListEqual(list(outputs), self.template.load(path, full=True))
+        floats = [i / 7.0 for i in range(30000)]
+        self.assertListEqual(list(template([float]).iter_load(self.dump(floats))), floats)
+
+    def test_iter_load_invalid(self):
+        records = self.records[:]
+        records[150] = dict(records[150], id='abc')
+        outputs = self.template.iter_load(self.dump(records))
+        for _ in range(150):
+            next(outputs)
+        self.assertRaises(NativeValidationError, next, outputs)
+
+    def test_iter_load_branches(self):
+        path = self.dump([1, 2, 2.5])
+        self.assertListEqual(list(template([int, float]).iter_load(path)), [1, 2, 2.5])
+        self.assertRaises(ValidationError, list, template([int, float]).iter_load(path, strict=True))
+
+    def test_iter_load_size(self):
+        path = self.dump(self.records)
+        self.assertEqual(len(list(template(size(self.template.value, 1, 200)).iter_load(path))), 200)
+        with self.assertRaises(SizeValidationError) as context:
+            list(template(size(self.template.value, 1, 100)).iter_load(path))
+        self.assertEqual(context.exception.actual, 101)
+        self.assertTrue(context.exception.truncated)
+        self.assertIn('has more than 100', str(context.exception))
+        self.assertRaises(KeysValidationError, list,
+                          template(strict([{'id': int}])).iter_load(path))
+        self.assertRaises(SizeValidationError, list, template(size([int], 1, 5)).iter_load(self.dump([])))
+
+    def test_iter_load_sample(self):
+        records = self.records[:]
+        records[150] = dict(records[150], id='abc')
+        sampled = template(sample(size(self.template.value, 1, 300), rate=0.01, min_count=2))
+        path = self.dump(self.records)
+        self.assertListEqual(list(sampled.iter_load(path, full=True)), self.template.load(path, full=True))
+        self.assertIsNone(sampled.check(records))
+        outputs = sampled.iter_load(self.dump(records))
+        for _ in range(150):
+            next(outputs)
+        self.assertRaises(NativeValidationError, next, outputs)
+        self.assertRaises(SizeValidationError, list, template(sample(size([int], 1, 5))).iter_load(self.dump([])))
+
+    def dump_lines(self, lines):
+        path = os.path.join(self.directory, 'data.jsonl')
+        with io.open(path, 'w', encoding='utf-8') as data:
+            data.write('\n'.join(lines) + '\n')
+        return path
+
+    def test_load_lines(self):
+        lines = [json.dumps(record) for record in self.records[:20]]
+        lines[3] = json.dumps(dict(self.records[3], unknown=1))
+        lines[5] = '{"id": 5, "name": '
+        lines[7] = json.dumps(dict(self.records[7], id='abc'))
+        lines.insert(9, '')
+        path = self.dump_lines(lines)
+        element = self.template.value[0]
+
+        loader = element.load_lines(path, full=True, strict=True)
+        results = list(loader)
+        self.assertListEqual([number for number, _ in results], [1, 2, 3, 5, 7, 9] + list(range(11, 22)))
+        self.assertEqual(results[0][1], element.output(self.records[0], full=True))
+        self.assertEqual((loader.accepted, loader.rejected), (17, 3))
+        self.assertListEqual([number for number, _ in loader.rejects], [4, 6, 8])
+        self.assertIsInstance(loader.rejects[0][1], KeysValidationError)
+        self.assertIsInstance(loader.rejects[1][1], ValueError)
+        self.assertIsInstance(loader.rejects[2][1], NativeValidationError)
+        self.assertEqual(loader.summary(), '17 lines accepted, 3 rejected (lines 4, 6, 8)')
+        self.assertEqual(len(list(loader)), 17)
+        self.assertEqual(loader.summary(), '17 lines accepted, 3 rejected (lines 4, 6, 8)')
+
+        with io.open(path, encoding='utf-8') as data:
+            loader = element.load_lines(data, on_error='skip')
+            self.assertEqual(len(list(loader)), 18)
+        self.assertEqual((loader.rejected, loader.rejects), (2, []))
+
+        loader = element.load_lines(path, on_error='raise')
+        with self.assertRaises(ValueError):
+            list(loader)
+        self.assertEqual(loader.line_number, 6)
+        self.assertRaises(TemplateValueError, element.load_lines, path, on_error='ignore')
+
+    def test_decode(self):
+        documents = [DOCUMENT, json.dumps(self.records), '[]', '{}', '[1, 2.5]', 'null', '"a"']
+        data = dict(json.loads(DOCUMENT), nickname=None, scores=[1, 2.5], values=[1.5, 2], unknown=None)
+        documents.append(json.dumps(data, indent=2))
+        del data['animals'], data['unknown']
+        documents.append(json.dumps(data).encode('utf-8'))
+        for value in (DICT_TEMPLATE, [DICT_TEMPLATE], self.template.value,
+                      [[int]], optional(size([{'a': int}], 1, 2))):
+            for document in documents:
+                for strict_ in (False, True):
+                    try:
+                        expected = template(value).loads(document, True, strict_)
+                    except ValidationError:
+                        self.assertRaises(ValidationError, template(value).decode, document, True, strict_)
+                    else:
+                        self.assertEqual(template(value).decode(document, True, strict_), expected)
+
+    def test_decode_early(self):
+        record = template({'id': int, 'extra': optional({'a': int}), 'tags': [str]})
+        document = '{"id": 1, "unknown": 1, "tags": [' + '"a", ' * 1000 + 'oops'
+        self.assertRaises(ValueError, record.decode, document)
+        self.assertRaises(KeysValidationError, record.decode, document, strict=True)
+        self.assertRaises(NativeValidationError, template([record]).decode, '[{"id": "x", ' + '"tags": [], ' * 1000)
+        self.assertRaises(ValueError, self.template.decode, '[' + json.dumps(self.records[0]) + ' 2]')
+        self.assertRaises(ValueError, self.template.decode, '[] []')
+        # the arrays of objects under an object are decoded element by element, the first invalid one stops the decoding
+        records = template({'records': size([{'id': int}], 0, 10 ** 6), 'count': int})
+        self.assertRaises(NativeValidationError, records.decode, '{"records": [{"id": "x"}, ' + '{"id": 1}, ' * 1000)
+        self.assertRaises(NativeValidationError, template({'a': optional([[{'id': int}]])}).decode,
+                          '{"a": [[{"id": "x"}], ' + '[], ' * 1000)
+        document = json.dumps({'records': [{'id': i} for i in range(10)], 'count': 10})
+        self.assertEqual(records.decode(document), records.loads(document))
+
+    def test_decode_bare_stop(self):
+        # the scanner of python 2 raises StopIteration without the position of the invalid value
+        def scan(text, pos):
+            raise StopIteration()
+        decoder = TemplateDecoder('[1, oops]')
+        decoder._scan = scan
+        self.assertRaises(ValueError, decoder.value, 4)
+
+    def test_iter_load_not_a_list(self):
+        path = self.dump(self.records)
+        self.assertRaises(TemplateTypeError, template({'a': int}).iter_load, path)
+        self.assertRaises(TemplateTypeError, template((int, str)).iter_load, path)
+
+if __name__ == '__main__':
+    unittest.main()